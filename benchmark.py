@@ -0,0 +1,311 @@
+"""Benchmarks for the post-processing hot path of linkedin_automation.py.
+
+Times email extraction, keyword classification, post identifiers, record decoding and the full
+process_post path plus the fit-queue drain (with a stub driver, OpenAI client and SMTP transport) over
+posts from saved page snapshots, requests.jsonl and a synthetic generator, and compares them against a
+stored baseline. Re-record the baseline whenever a stage's definition changes.
+
+    python benchmark.py                      # compare against benchmark_baseline.json
+    python benchmark.py --synthetic 100000   # larger synthetic corpus
+    python benchmark.py --update-baseline    # record the current numbers as the new baseline
+"""
+import argparse
+import contextlib
+import glob
+import io
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+import linkedin_automation as automation
+
+BASELINE_FILE = 'benchmark_baseline.json'
+# Resume the benchmark bot is built with, by absolute path so the work measured doesn't depend on
+# the working directory or on when Settings next checks for resume files
+RESUME_FIXTURE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'resume.txt')
+# Fixed text for the calibration loop that factors host speed out of the comparison
+CALIBRATION_TEXT = "Senior Java Developer, Spring Boot and AWS, contract in Dallas, TX 75201. Email jobs@example.com " * 4
+
+# Building blocks for synthetic posts, mixed so every filter branch gets exercised
+SYNTHETIC_OPENINGS = [
+    "We are hiring a Senior Java Developer for a long term project.",
+    "Urgent requirement: Java Spring Boot developer with microservices experience.",
+    "Looking for a Java Full Stack Engineer with React and AWS.",
+    "Hiring Java backend developers with Kafka and Kubernetes experience.",
+    "I am looking for new opportunities as a Java Developer, open to work.",
+    "Immediate need for a Java/J2EE developer with strong SQL skills."
+]
+SYNTHETIC_LOCATIONS = [
+    "Location: Dallas, TX 75201 (Hybrid).", "Remote US only.", "Location: New York, NY.",
+    "Location: Hyderabad, India.", "Onsite in Toronto, Canada.", "Location: Chicago, IL 60601.", ""
+]
+SYNTHETIC_TERMS = [
+    "Contract role, C2C is fine.", "Duration: 12 months contract.", "W2 only, no C2C.",
+    "Full time only.", "Corp to corp accepted.", ""
+]
+SYNTHETIC_CONTACTS = [
+    "Please share your resume at {user}@{domain}.com", "Email: {user} [at] {domain} [dot] com",
+    "Send profiles to {user}(at){domain}.com", "Reach me at {user}@{domain}.io for details.",
+    "DM me for details.", "Apply through the link in comments."
+]
+SYNTHETIC_FILLER = [
+    "Must have 8+ years of experience with Java 11, Spring Boot and REST APIs.",
+    "Experience with CI/CD pipelines, Jenkins and Docker is a plus.",
+    "Strong communication skills and banking domain experience preferred.",
+    "#java #hiring #c2c #contract #springboot #microservices",
+    "Visa: H1B, GC, USC welcome."
+]
+
+
+def synthetic_posts(count, seed=7):
+    """Generate count post records shaped like extract_post_records output"""
+    rng = random.Random(seed)
+    records = []
+    for i in range(count):
+        domain = f"staffing{rng.randrange(count)}"
+        parts = [
+            rng.choice(SYNTHETIC_OPENINGS),
+            rng.choice(SYNTHETIC_LOCATIONS),
+            rng.choice(SYNTHETIC_TERMS),
+            rng.choice(SYNTHETIC_CONTACTS).format(user=f"recruiter{i}", domain=domain)
+        ] + rng.sample(SYNTHETIC_FILLER, rng.randrange(len(SYNTHETIC_FILLER)))
+        content = " ".join(part for part in parts if part)
+        records.append({
+            'data_id': '',
+            'urn': f"urn:li:activity:{7000000000000000000 + i}",
+            'author': f"Recruiter {i}",
+            'age': f"{rng.randrange(1, 24)}h • ",
+            'content': content,
+            'job_description': "",
+            'permalink': '',
+            'id_author': f"Recruiter {i} ",
+            'id_content': content[:100] + ' '
+        })
+    return records
+
+
+def fixture_posts(snapshot_dir, requests_file):
+    """Post records from saved HTML snapshots plus one record per request body in requests_file"""
+    records = []
+    paths = glob.glob(os.path.join(snapshot_dir, '*.html')) + glob.glob(os.path.join(snapshot_dir, '*.html.gz'))
+    for path in sorted(paths):
+        try:
+            records.extend(automation.load_snapshot_records(path))
+        except Exception as e:
+            print(f"Skipping snapshot {path}: {e}", file=sys.stderr)
+    if requests_file and os.path.exists(requests_file):
+        with open(requests_file, 'r', encoding='utf-8') as f:
+            for line in f:
+                if line.strip():
+                    request = json.loads(line)
+                    text = f"{request.get('title', '')}\n{request.get('body', '')}"
+                    records.append({
+                        'data_id': '', 'urn': f"urn:li:request:{request.get('request_id')}",
+                        'author': 'Requests fixture', 'age': '', 'content': text, 'job_description': '',
+                        'permalink': '', 'id_author': '', 'id_content': text[:100]
+                    })
+    return records
+
+
+class StubChatCompletion:
+    """Stands in for openai.ChatCompletion with a fixed, instant reply"""
+    REPLY = {'content': "Subject: Java Developer - Contract\n\nHello,\n\nI am interested in this role.\n\nThanks"}
+
+    @classmethod
+    def create(cls, **kwargs):
+        return type('Response', (), {'choices': [type('Choice', (), {'message': cls.REPLY})()]})()
+
+
+class StubOpenAI:
+    ChatCompletion = StubChatCompletion
+
+
+class StubSMTP:
+    """Accepts every message without touching the network"""
+
+    def send(self, msg):
+        msg.as_string()
+
+    def close(self):
+        pass
+
+
+class StubDriver:
+    """Returns a fixed extraction result so record decoding and bookkeeping can be timed without Chrome"""
+
+    def __init__(self, records):
+        self.payload = json.dumps({'selector': automation.POST_SELECTORS[0], 'total': len(records),
+                                   'watermark': None, 'records': records})
+
+    def execute_script(self, script, *args):
+        return self.payload
+
+    def quit(self):
+        pass
+
+
+def make_bot(workdir):
+    """A bot with a fresh state store in workdir and stubbed OpenAI and SMTP"""
+    previous = os.getcwd()
+    os.chdir(workdir)
+    try:
+        settings = automation.Settings(os.path.join(workdir, 'config.json'), resume_paths=[RESUME_FIXTURE])
+        bot = automation.LinkedInPostAutomation(settings)
+    finally:
+        os.chdir(previous)
+    bot.openai_client = StubOpenAI
+    bot.smtp = StubSMTP()
+    bot.email = 'bench@example.com'
+    return bot
+
+
+def calibrate(rounds=200):
+    """Wall time for a fixed regex, string and dict workload shaped like the hot path"""
+    start = time.perf_counter()
+    for i in range(rounds):
+        counts = {}
+        for word in automation.PROMPT_WORD_PATTERN.findall(CALIBRATION_TEXT.lower()):
+            counts[word] = counts.get(word, 0) + i
+    return time.perf_counter() - start
+
+
+def time_stage(setup, run, repeat, min_seconds=0.5, max_runs=50):
+    """Median wall time for run(setup()), and the median of its ratio to the calibration loop timed right before each run.
+
+    Runs at least repeat times, and small corpora are run more often (up to max_runs) until
+    min_seconds have been measured, so the medians are not dominated by timer noise. stdout is
+    discarded.
+    """
+    timings = []
+    ratios = []
+    measured = 0.0
+    while len(timings) < repeat or (measured < min_seconds and len(timings) < max_runs):
+        context = setup() if setup else None
+        calibration = calibrate()
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            run(context)
+            elapsed = time.perf_counter() - start
+        timings.append(elapsed)
+        ratios.append(elapsed / calibration)
+        measured += elapsed
+    return statistics.median(timings), statistics.median(ratios)
+
+
+def benchmark(records, repeat):
+    """Return {stage: {'us_per_post', 'calibration_ms'}} for one corpus"""
+    texts = [record['content'] + " " + record['job_description'] for record in records]
+    lowered = [text.lower() for text in texts]
+    chunks = [records[i:i + 25] for i in range(0, len(records), 25)]
+    workdir = tempfile.TemporaryDirectory(prefix='linkedin-bench-')
+    bots = []
+
+    def fresh_bot():
+        bot = make_bot(tempfile.mkdtemp(dir=workdir.name))
+        bots.append(bot)
+        return bot
+
+    def decode_setup():
+        return fresh_bot(), [StubDriver(chunk) for chunk in chunks]
+
+    def decode(context):
+        bot, drivers = context
+        for driver in drivers:
+            bot.driver = driver
+            bot.extract_post_records()
+
+    # Each stage is (setup, run); setup runs outside the timed section
+    stages = {
+        'extract_emails': (None, lambda _: [automation.extract_emails(text) for text in texts]),
+        'classify': (None, lambda _: [automation.POST_CLASSIFIER.classify(text) for text in lowered]),
+        'post_identifier': (fresh_bot, lambda bot: [bot.get_post_identifier(record) for record in records]),
+        'evaluate_post': (fresh_bot, lambda bot: [bot.evaluate_post(record) for record in records]),
+        'decode_records': (decode_setup, decode),
+        'end_to_end': (fresh_bot, lambda bot: ([bot.process_post(record) for record in records], bot.drain_fit_queue()))
+    }
+    results = {}
+    try:
+        for name, (setup, run) in stages.items():
+            elapsed, ratio = time_stage(setup, run, repeat)
+            # calibration_ms is the loop time implied by the median ratio, so elapsed / calibration_ms
+            # compares like with like between runs
+            results[name] = {'us_per_post': elapsed / len(records) * 1e6, 'calibration_ms': elapsed / ratio * 1000}
+    finally:
+        for bot in bots:
+            bot.state.close()
+        workdir.cleanup()
+    return results
+
+
+def compare(results, baseline, threshold, min_delta):
+    """Print each stage against the baseline and return the stages that regressed beyond threshold.
+
+    Timings are scaled by the calibration loop measured before each stage, so the comparison is in
+    baseline-host microseconds. A stage only counts as regressed when it is also more than min_delta
+    microseconds per post slower, which keeps sub-microsecond stages from failing on timer noise.
+    """
+    regressions = []
+    print(f"{'stage':<32} {'us/post':>10} {'scaled':>10} {'baseline':>10} {'change':>8}")
+    for key, result in results.items():
+        value = result['us_per_post']
+        reference = baseline.get(key)
+        if isinstance(reference, dict) and reference.get('us_per_post'):
+            scaled = value * reference['calibration_ms'] / result['calibration_ms']
+            change = scaled / reference['us_per_post'] - 1
+            regressed = change > threshold and scaled - reference['us_per_post'] > min_delta
+            flag = "  REGRESSION" if regressed else ""
+            print(f"{key:<32} {value:10.2f} {scaled:10.2f} {reference['us_per_post']:10.2f} {change * 100:+7.0f}%{flag}")
+            if regressed:
+                regressions.append(key)
+        else:
+            print(f"{key:<32} {value:10.2f} {'-':>10} {'-':>10} {'':>8}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the post-processing hot path")
+    parser.add_argument('--snapshots', default='.', help="Directory of saved *.html page snapshots")
+    parser.add_argument('--requests', default='requests.jsonl', help="JSON-lines file whose bodies are used as post text")
+    parser.add_argument('--synthetic', type=int, default=10000, help="Number of synthetic posts (up to 100000)")
+    parser.add_argument('--repeat', type=int, default=9, help="Runs per stage; the median is kept")
+    parser.add_argument('--baseline', default=BASELINE_FILE, help="Baseline file to compare against")
+    parser.add_argument('--threshold', type=float, default=0.3, help="Allowed slowdown before failing (0.3 = 30%%)")
+    parser.add_argument('--min-delta', type=float, default=0.5, help="Smallest slowdown in us/post that can fail the run")
+    parser.add_argument('--update-baseline', action='store_true', help="Write the results as the new baseline")
+    args = parser.parse_args()
+
+    corpora = {
+        'fixtures': fixture_posts(args.snapshots, args.requests),
+        'synthetic': synthetic_posts(min(args.synthetic, 100000))
+    }
+    results = {}
+    for corpus, records in corpora.items():
+        if not records:
+            print(f"No {corpus} posts found, skipping")
+            continue
+        start = time.perf_counter()
+        for name, value in benchmark(records, args.repeat).items():
+            results[f"{corpus}/{name}"] = value
+        print(f"Benchmarked {len(records)} {corpus} posts in {time.perf_counter() - start:.1f}s")
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline, 'r') as f:
+            baseline = json.load(f)
+    regressions = compare(results, baseline, args.threshold, args.min_delta)
+
+    if args.update_baseline:
+        with open(args.baseline, 'w') as f:
+            json.dump(results, f, indent=4, sort_keys=True)
+        print(f"Saved baseline to {args.baseline}")
+    elif regressions:
+        print(f"{len(regressions)} stage(s) slower than baseline by more than {args.threshold:.0%}: {', '.join(regressions)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
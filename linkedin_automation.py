@@ -20,25 +20,1925 @@ import openai
 import logging
 import uuid
 import hashlib
+import math
+import argparse
+import glob
+import sqlite3
+import threading
+import queue
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+import gc
+import sys
+from urllib.parse import urlencode, quote, urlparse
+from html.parser import HTMLParser
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+import atexit
+import gzip
+import struct
+import heapq
 
-# Set up logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler('linkedin_automation.log'),
-        logging.StreamHandler()
+LOG_FILE = 'linkedin_automation.log'
+
+# Fields passed to log calls through extra= that are copied into the JSON log events
+LOG_EVENT_FIELDS = ('post_id', 'stage', 'decision', 'duration_ms', 'search_term')
+
+class JsonLogFormatter(logging.Formatter):
+    """Formats each record as one JSON event per line"""
+
+    def format(self, record):
+        event = {
+            'time': self.formatTime(record),
+            'level': record.levelname,
+            'thread': record.threadName,
+            'message': record.getMessage()
+        }
+        for field in LOG_EVENT_FIELDS:
+            if hasattr(record, field):
+                event[field] = getattr(record, field)
+        if record.exc_info:
+            event['exception'] = self.formatException(record.exc_info)
+        return json.dumps(event, default=str)
+
+class RateLimitFilter(logging.Filter):
+    """Lets each repeated message through `burst` times per `window` seconds and counts the rest"""
+    DIGITS = re.compile(r'\d+')
+
+    def __init__(self, burst=5, window=60):
+        super().__init__()
+        self.burst = burst
+        self.window = window
+        self.recent = {}
+        self.lock = threading.Lock()
+
+    def filter(self, record):
+        # Errors and structured per-post events are always kept
+        if record.levelno >= logging.ERROR or any(hasattr(record, field) for field in LOG_EVENT_FIELDS):
+            return True
+        # Numbers are ignored so "scroll 3/100" and "scroll 4/100" count as the same message
+        key = (record.levelno, self.DIGITS.sub('#', str(record.msg)))
+        now = time.monotonic()
+        with self.lock:
+            entry = self.recent.get(key)
+            if entry is None or now - entry[0] >= self.window:
+                if len(self.recent) > 1000:
+                    self.recent = {k: v for k, v in self.recent.items() if now - v[0] < self.window}
+                self.recent[key] = [now, 1, 0]
+                if entry and entry[2]:
+                    record.msg = f"{record.msg} [{entry[2]} similar messages suppressed]"
+                return True
+            entry[1] += 1
+            if entry[1] <= self.burst:
+                return True
+            entry[2] += 1
+            return False
+
+_LOG_LISTENER = None
+
+def setup_logging(settings=None):
+    """Send log records through a queue so rotating JSON file and console output happen off the calling thread"""
+    global _LOG_LISTENER
+    get = settings.get if settings else (lambda key, default=None: default)
+    
+    file_handler = RotatingFileHandler(LOG_FILE, maxBytes=int(get('log_max_mb', 5) * 1024 * 1024),
+                                       backupCount=get('log_backups', 3), encoding='utf-8')
+    file_handler.setFormatter(JsonLogFormatter())
+    file_handler.setLevel(get('log_level', 'INFO').upper())
+    console_handler = logging.StreamHandler()
+    console_handler.setFormatter(logging.Formatter('%(asctime)s - %(levelname)s - %(message)s'))
+    console_handler.setLevel(get('console_log_level', 'INFO').upper())
+    
+    log_queue = queue.Queue(-1)
+    queue_handler = QueueHandler(log_queue)
+    queue_handler.addFilter(RateLimitFilter(get('log_rate_limit', 5), get('log_rate_window', 60)))
+    
+    if _LOG_LISTENER:
+        _LOG_LISTENER.stop()
+    else:
+        atexit.register(lambda: _LOG_LISTENER.stop())
+    root = logging.getLogger()
+    for handler in root.handlers[:]:
+        root.removeHandler(handler)
+    root.addHandler(queue_handler)
+    root.setLevel(min(file_handler.level, console_handler.level))
+    _LOG_LISTENER = QueueListener(log_queue, file_handler, console_handler, respect_handler_level=True)
+    _LOG_LISTENER.start()
+
+# Selectors used to locate post containers, tried in order until one matches
+POST_SELECTORS = [
+    ".feed-shared-update-v2",
+    ".search-result__occluded-item",
+    ".search-results__list-item",
+    ".ember-view.occludable-update",
+    ".search-content__result",
+    "li.reusable-search__result-container",
+    "div.feed-shared-update-v2__content",
+    "div[data-urn]",
+    "div.relative.ember-view"
+]
+
+# Selectors used to pull the individual fields out of a post container
+POST_FIELD_SELECTORS = {
+    'content': ".feed-shared-update-v2__description-wrapper, .feed-shared-text, .update-components-text, .feed-shared-update-v2__commentary, .update-components-text span[dir='ltr'], .feed-shared-text__text-view, .feed-shared-update-v2__update-content-wrapper",
+    'author': ".feed-shared-actor__name, .update-components-actor__name, .feed-shared-actor__title, .update-components-actor__meta a, .feed-shared-actor__meta a, .update-components-actor__meta-link",
+    'job_description': ".feed-shared-update-v2__description, .feed-shared-text__text-view, .update-components-text, .feed-shared-inline-show-more-text",
+    'id_author': ".feed-shared-actor__name, .update-components-actor__name",
+    'id_content': ".feed-shared-update-v2__description-wrapper, .feed-shared-text",
+    'age': ".update-components-actor__sub-description, .feed-shared-actor__sub-description",
+    'links': "a.app-aware-link"
+}
+
+# Collects every post not yet returned on this page in a single round trip and returns the records
+# as JSON. Returned posts are remembered page-side (by data-urn, or a marker attribute for posts
+# without one), so each scroll only ships newly inserted posts back to Python.
+# arguments[0] is POST_SELECTORS, arguments[1] is POST_FIELD_SELECTORS.
+POST_EXTRACTION_SCRIPT = """
+const postSelectors = arguments[0];
+const fields = arguments[1];
+const seenUrns = window.__automationSeenUrns = window.__automationSeenUrns || new Set();
+
+let posts = [];
+let matchedSelector = null;
+let pageTotal = 0;
+for (const selector of postSelectors) {
+    if (document.querySelector(selector)) {
+        matchedSelector = selector;
+        pageTotal = document.querySelectorAll(selector).length;
+        posts = Array.from(document.querySelectorAll(selector + ':not([data-automation-seen])'))
+            .filter(post => !seenUrns.has(post.getAttribute('data-urn')));
+        break;
+    }
+}
+
+const texts = (root, selector) => Array.from(root.querySelectorAll(selector))
+    .map(element => element.innerText || '');
+const joined = parts => parts.map(text => text + ' ').join('').trim();
+
+const records = [];
+for (const post of posts) {
+    const content = joined(texts(post, fields.content));
+    // Posts that haven't rendered their text yet are left for a later pass
+    if (!content) {
+        continue;
+    }
+    post.setAttribute('data-automation-seen', '1');
+    const urn = post.getAttribute('data-urn');
+    if (urn) {
+        seenUrns.add(urn);
+        window.__automationWatermark = urn;
+    }
+    const description = joined(
+        texts(post, fields.job_description).filter(text => text && !content.includes(text))
+    );
+
+    let permalink = '';
+    for (const link of post.querySelectorAll(fields.links)) {
+        if (link.href && link.href.includes('/posts/')) {
+            permalink = link.href;
+            break;
+        }
+    }
+
+    records.push({
+        data_id: post.getAttribute('data-id') || '',
+        urn: urn || '',
+        author: joined(texts(post, fields.author)),
+        age: joined(texts(post, fields.age)),
+        content: content,
+        job_description: description,
+        permalink: permalink,
+        id_author: texts(post, fields.id_author).map(text => text + ' ').join(''),
+        id_content: texts(post, fields.id_content).map(text => text + ' ').join('')
+    });
+}
+
+return JSON.stringify({selector: matchedSelector, total: pageTotal, watermark: window.__automationWatermark || null, records: records});
+"""
+
+# Extra Chrome flags for lean mode: no window, GPU, extensions or background services
+LEAN_BROWSER_ARGUMENTS = [
+    "--headless=new",
+    "--window-size=1280,2000",
+    "--disable-gpu",
+    "--disable-extensions",
+    "--disable-background-networking",
+    "--disable-sync",
+    "--no-first-run",
+    "--mute-audio",
+    "--renderer-process-limit=2",
+    "--blink-settings=imagesEnabled=false"
+]
+
+# Requests dropped at the network layer in lean mode; LinkedIn serves images and video without file extensions
+BLOCKED_RESOURCE_PATTERNS = [
+    "*.jpg*", "*.jpeg*", "*.png*", "*.gif*", "*.webp*", "*.svg*", "*.ico*",
+    "*.mp4*", "*.webm*", "*.m3u8*",
+    "*.woff*", "*.ttf*", "*.otf*",
+    "*media.licdn.com/dms/image*", "*dms.licdn.com/playlist*"
+]
+
+# Navigation timing and transfer totals for the current page, used by --measure-browser
+PAGE_LOAD_METRICS_SCRIPT = """
+const navigation = performance.getEntriesByType('navigation')[0];
+const resources = performance.getEntriesByType('resource');
+const transferred = resources.reduce((sum, entry) => sum + (entry.transferSize || 0), navigation ? navigation.transferSize : 0);
+return {
+    load_ms: navigation ? navigation.loadEventEnd - navigation.startTime : 0,
+    requests: resources.length,
+    transfer_kb: transferred / 1024
+};
+"""
+
+# Where LinkedIn lands when checking a saved session: the feed if it's valid, a login page otherwise
+SESSION_URL_MARKERS = ('/feed', '/login', '/authwall', '/checkpoint', '/uas/')
+
+# Content search results; the query string carries the keywords, sort order and date filter
+SEARCH_RESULTS_URL = "https://www.linkedin.com/search/results/content/?"
+
+# Search-page controls clicked during setup, each a list of (strategy, selector, keywords) candidates
+# in fallback order. A candidate matches the first displayed element whose text or aria-label contains
+# one of the keywords (any displayed element when there are none). SelectorRegistry reorders these
+# by past success, so the order here only matters until a selector has worked once.
+SORT_DROPDOWN_SELECTORS = [
+    (By.CSS_SELECTOR, "button.search-reusables__filter-trigger-and-dropdown", ('sort',)),
+    (By.CSS_SELECTOR, "button[aria-label='Sort by']", ('sort',)),
+    (By.CSS_SELECTOR, "button.artdeco-dropdown__trigger--is-dropdown-trigger", ('sort',)),
+    (By.CSS_SELECTOR, "button.search-reusables__sort-dropdown-trigger", ('sort',)),
+    (By.CSS_SELECTOR, "button.search-reusables__sort-filter", ('sort',)),
+    (By.CSS_SELECTOR, ".search-reusables__primary-filter button[data-control-name='sort_dropdown']", ('sort',))
+]
+
+UI_TARGETS = {
+    'posts_tab': [
+        (By.CSS_SELECTOR, "button.search-reusables__filter-pill-button[aria-label='Posts']", ('posts',)),
+        (By.CSS_SELECTOR, "button[data-control-name='search_filter_posts']", ('posts',)),
+        (By.CSS_SELECTOR, ".search-reusables__filter-trigger-and-dropdown[aria-label='Posts']", ('posts',)),
+        (By.CSS_SELECTOR, ".artdeco-pill.artdeco-pill--slate.artdeco-pill--choice.artdeco-pill--2.search-reusables__filter-pill-button[aria-label='Posts']", ('posts',)),
+        (By.XPATH, "//button[contains(text(), 'Posts')]", ()),
+        (By.XPATH, "//button[contains(@aria-label, 'Posts')]", ()),
+        (By.XPATH, "//span[contains(text(), 'Posts')]/parent::button", ()),
+        (By.XPATH, "//div[contains(@class, 'search-reusables')]//*[contains(text(), 'Posts')]", ()),
+        (By.CSS_SELECTOR, ".search-reusables__filter-pill-button, .artdeco-pill--choice, [data-control-name*='filter'], .search-reusables__primary-filter button", ('posts',))
+    ],
+    'filter_dropdown': SORT_DROPDOWN_SELECTORS,
+    'posts_option': [
+        (By.CSS_SELECTOR, ".artdeco-dropdown__content li button:contains('Posts')", ('posts',)),
+        (By.CSS_SELECTOR, ".search-reusables__dropdown-list li button:contains('Posts')", ('posts',)),
+        (By.CSS_SELECTOR, ".artdeco-dropdown__item:contains('Posts')", ('posts',))
+    ],
+    'sort_dropdown': SORT_DROPDOWN_SELECTORS + [
+        (By.XPATH, "//button[contains(text(), 'Sort by')]", ()),
+        (By.XPATH, "//button[contains(@aria-label, 'Sort')]", ()),
+        (By.XPATH, "//span[contains(text(), 'Sort')]/parent::button", ()),
+        (By.XPATH, "//div[contains(@class, 'search-reusables')]//*[contains(text(), 'Sort')]", ())
+    ],
+    'recent_option': [
+        (By.CSS_SELECTOR, "button[aria-label='Recent']", ('recent',)),
+        (By.CSS_SELECTOR, "button[aria-label='Sort by Recent']", ('recent',)),
+        (By.CSS_SELECTOR, "button.search-reusables__sort-filter-subfilter[data-control-name='recent_sort']", ('recent',)),
+        (By.CSS_SELECTOR, ".artdeco-dropdown__content button:nth-child(2)", ('recent',)),
+        (By.CSS_SELECTOR, ".search-reusables__sort-filter-dropdown button:nth-child(2)", ('recent',)),
+        (By.CSS_SELECTOR, "li.search-reusables__primary-filter button", ('recent',)),
+        (By.XPATH, "//button[contains(text(), 'Recent')]", ()),
+        (By.XPATH, "//button[contains(@aria-label, 'Recent')]", ()),
+        (By.XPATH, "//span[contains(text(), 'Recent')]/parent::button", ()),
+        (By.XPATH, "//div[contains(@class, 'dropdown__content')]//*[contains(text(), 'Recent')]", ())
+    ],
+    'date_filter_dropdown': [
+        (By.CSS_SELECTOR, "button[aria-label='Date posted filter']", ('date',)),
+        (By.CSS_SELECTOR, "button.search-reusables__filter-trigger-and-dropdown[aria-label='Date posted filter']", ('date',)),
+        (By.CSS_SELECTOR, ".search-reusables__filter-trigger-and-dropdown button[aria-controls*='date']", ('date',)),
+        (By.CSS_SELECTOR, ".artdeco-dropdown__trigger[aria-label*='Date']", ('date',)),
+        (By.CSS_SELECTOR, "button[data-control-name='filter_timePosted']", ('date',)),
+        (By.XPATH, "//button[contains(text(), 'Date posted')]", ()),
+        (By.XPATH, "//button[contains(@aria-label, 'Date')]", ()),
+        (By.XPATH, "//span[contains(text(), 'Date')]/parent::button", ()),
+        (By.XPATH, "//div[contains(@class, 'search-reusables')]//*[contains(text(), 'Date')]", ())
+    ],
+    'past_24h_option': [
+        (By.CSS_SELECTOR, "button[aria-label='Past 24 hours']", ('24', 'day')),
+        (By.CSS_SELECTOR, "button.search-reusables__filter-value-item[data-control-name='timePosted_past-24']", ('24', 'day')),
+        (By.CSS_SELECTOR, ".artdeco-dropdown__content li:first-child button", ('24', 'day')),
+        (By.CSS_SELECTOR, ".search-reusables__dropdown-list li:first-child button", ('24', 'day')),
+        (By.CSS_SELECTOR, "button[data-control-name='filter_timePosted_24h']", ('24', 'day')),
+        (By.XPATH, "//button[contains(text(), 'Past 24')]", ()),
+        (By.XPATH, "//button[contains(text(), '24 hours')]", ()),
+        (By.XPATH, "//button[contains(@aria-label, 'Past 24')]", ()),
+        (By.XPATH, "//span[contains(text(), 'Past 24')]/parent::button", ()),
+        (By.XPATH, "//div[contains(@class, 'dropdown__content')]//*[contains(text(), 'Past 24')]", ())
     ]
+}
+
+# Pre-fills the extraction script's seen-set with post ids returned on earlier searches
+SEED_SEEN_POSTS_SCRIPT = """
+window.__automationSeenUrns = new Set(arguments[0]);
+"""
+
+# Phrases that mark a post as written by a candidate rather than a recruiter
+CANDIDATE_INDICATORS = [
+    'open to work',
+    'seeking opportunities',
+    'job seeker',
+    'seeking a role',
+    'seeking a position'
+]
+
+# Terms that indicate a US-based job
+US_TERMS = ['united states', 'usa', 'u.s.', 'u.s.a', 'america', 'american', 'remote us', 'us remote',
+            'california', 'new york', 'texas', 'florida', 'illinois', 'pennsylvania', 'ohio', 'georgia',
+            'north carolina', 'michigan', 'new jersey', 'virginia', 'washington', 'arizona', 'massachusetts',
+            'tennessee', 'indiana', 'missouri', 'maryland', 'wisconsin', 'minnesota', 'colorado', 'alabama',
+            'south carolina', 'louisiana', 'kentucky', 'oregon', 'oklahoma', 'connecticut', 'utah', 'iowa',
+            'nevada', 'arkansas', 'mississippi', 'kansas', 'new mexico', 'nebraska', 'west virginia',
+            'idaho', 'hawaii', 'new hampshire', 'maine', 'montana', 'rhode island', 'delaware',
+            'south dakota', 'north dakota', 'alaska', 'vermont', 'wyoming', 'dc', 'washington dc',
+            'chicago', 'new york city', 'nyc', 'los angeles', 'la', 'san francisco', 'sf', 'seattle',
+            'boston', 'austin', 'dallas', 'houston', 'atlanta', 'miami', 'philadelphia', 'phoenix',
+            'denver', 'san diego', 'san jose', 'nashville', 'portland', 'charlotte', 'raleigh']
+
+# Non-US locations to explicitly exclude
+NON_US_TERMS = ['india', 'hyderabad', 'bangalore', 'mumbai', 'delhi', 'chennai', 'kolkata', 'pune',
+                'ahmedabad', 'jaipur', 'surat', 'kanpur', 'nagpur', 'lucknow', 'indore', 'bhopal',
+                'united kingdom', 'uk', 'london', 'manchester', 'birmingham', 'liverpool', 'glasgow',
+                'canada', 'toronto', 'montreal', 'vancouver', 'ottawa', 'calgary', 'edmonton',
+                'australia', 'sydney', 'melbourne', 'brisbane', 'perth', 'adelaide',
+                'germany', 'berlin', 'munich', 'hamburg', 'frankfurt', 'cologne',
+                'france', 'paris', 'lyon', 'marseille', 'toulouse', 'nice',
+                'spain', 'madrid', 'barcelona', 'valencia', 'seville',
+                'italy', 'rome', 'milan', 'naples', 'turin', 'palermo',
+                'japan', 'tokyo', 'osaka', 'kyoto', 'yokohama', 'nagoya',
+                'china', 'beijing', 'shanghai', 'guangzhou', 'shenzhen',
+                'brazil', 'sao paulo', 'rio de janeiro', 'brasilia',
+                'mexico', 'mexico city', 'guadalajara', 'monterrey',
+                'singapore', 'hong kong', 'dubai', 'abu dhabi', 'doha', 'qatar',
+                'ireland', 'dublin', 'cork', 'galway',
+                'netherlands', 'amsterdam', 'rotterdam', 'the hague',
+                'sweden', 'stockholm', 'gothenburg', 'malmo',
+                'switzerland', 'zurich', 'geneva', 'bern',
+                'poland', 'warsaw', 'krakow', 'lodz',
+                'south africa', 'johannesburg', 'cape town', 'durban',
+                'new zealand', 'auckland', 'wellington', 'christchurch',
+                'argentina', 'buenos aires', 'cordoba', 'rosario',
+                'chile', 'santiago', 'valparaiso', 'concepcion',
+                'colombia', 'bogota', 'medellin', 'cali',
+                'israel', 'tel aviv', 'jerusalem', 'haifa',
+                'philippines', 'manila', 'quezon city', 'davao',
+                'vietnam', 'ho chi minh city', 'hanoi', 'da nang',
+                'thailand', 'bangkok', 'chiang mai', 'phuket',
+                'malaysia', 'kuala lumpur', 'penang', 'johor bahru',
+                'indonesia', 'jakarta', 'surabaya', 'bandung',
+                'pakistan', 'karachi', 'lahore', 'islamabad',
+                'bangladesh', 'dhaka', 'chittagong', 'khulna',
+                'sri lanka', 'colombo', 'kandy', 'galle',
+                'nepal', 'kathmandu', 'pokhara', 'lalitpur',
+                'remote global', 'worldwide remote', 'global remote', 'international remote']
+
+# Terms that indicate a contract/C2C position
+CONTRACT_TERMS = ['contract', 'c2c', 'corp-to-corp', 'corp to corp', 'corporation to corporation',
+                  'contractor', 'consulting', 'consultant', '1099', 'independent contractor', 'f2f']
+
+# Terms that explicitly rule out contract positions
+NON_CONTRACT_TERMS = ['w2 only', 'no c2c', 'no corp-to-corp', 'no 1099', 'permanent only', 'full time only', 'no contractors']
+
+# Email addresses, including obfuscated forms like "name [at] domain [dot] com", matched in one scan.
+# The local part may not start mid-token, the "at" may be @, [at], (at) or [.], and domain labels may
+# be joined by ".", " . ", [dot], (dot), [.] or " dot ".
+# A dot with a space on only one side ("corp .com", "corp. com") is only accepted between the first
+# domain label and a lower-case common top-level domain that ends the address. An address that
+# already has its TLD never grows further, so the next sentence stays out of it ("a@corp.com. Dev roles")
+EMAIL_SPACED_TLDS = 'com|net|org|io|edu|gov|biz|dev'
+EMAIL_CANDIDATE_PATTERN = re.compile(r"""
+    (?<![a-z0-9._%+-])
+    ([a-z0-9._%+-]+)
+    (?:\s*(?:@|\[at\]|\(at\)|\[\.\])\s*)
+    ([a-z0-9-]+(?:
+        \s*\.\s*(?-i:""" + EMAIL_SPACED_TLDS + r""")\b(?!\.\w)
+        |
+        (?:(?:\.|\s+\.\s+|\s*\[dot\]\s*|\s*\(dot\)\s*|\s*\[\.\]\s*|\s+dot\s+)[a-z0-9-]+)+
+    ))
+""", re.IGNORECASE | re.VERBOSE)
+EMAIL_DOMAIN_SEPARATOR_PATTERN = re.compile(r'\s*(?:\[dot\]|\(dot\)|\[\.\])\s*|\s+dot\s+|\s*\.\s+|\s+\.\s*', re.IGNORECASE)
+EMAIL_VALID_PATTERN = re.compile(r'[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}')
+EMAIL_HINT_PATTERN = re.compile(r'@|\[at\]|\(at\)|\[\.\]', re.IGNORECASE)
+
+def extract_emails(text):
+    """Extract all emails from text, undoing common obfuscations, in order of appearance"""
+    if not text:
+        return []
+    
+    # Replace common HTML entities
+    text = text.replace('&nbsp;', ' ').replace('&amp;', '&').replace('&lt;', '<').replace('&gt;', '>')
+    
+    # Most posts have no address at all, so skip the full scan when nothing could match
+    if not EMAIL_HINT_PATTERN.search(text):
+        return []
+    
+    emails = {}
+    for match in EMAIL_CANDIDATE_PATTERN.finditer(text):
+        domain = EMAIL_DOMAIN_SEPARATOR_PATTERN.sub('.', match.group(2))
+        email = f"{match.group(1)}@{domain}"
+        if EMAIL_VALID_PATTERN.fullmatch(email):
+            emails[email] = None
+    
+    return list(emails)
+
+def extract_emails_many(texts):
+    """Extract emails from many texts at once, for replay and backfill runs"""
+    return [extract_emails(text) for text in texts]
+
+class KeywordClassifier:
+    """Match several keyword categories against text in a single regex pass"""
+
+    def __init__(self, categories):
+        self.term_categories = {}
+        trie = {}
+        for category, terms in categories.items():
+            for term in terms:
+                term = term.strip().lower()
+                self.term_categories[term] = category
+                node = trie
+                for char in term:
+                    node = node.setdefault(char, {})
+                node[''] = True
+        # The terms are compiled as a prefix trie so each position only follows branches that can still
+        # match. Longer terms are tried first so overlaps resolve to the most specific term ('new mexico'
+        # over 'mexico'), and word boundaries on both sides keep short terms like 'la' or 'uk' from
+        # matching inside other words.
+        self.pattern = re.compile(rf'(?<![a-z0-9]){self._trie_pattern(trie)}(?![a-z0-9])')
+
+    def _trie_pattern(self, node):
+        """Build a regex fragment matching every term below a trie node, longest first"""
+        branches = [re.escape(char) + self._trie_pattern(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ''
+        pattern = branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+        if '' in node:
+            pattern = f'(?:{pattern})?'
+        return pattern
+
+    def classify(self, text):
+        """Return {category: [(term, position), ...]} for lowercased text, in text order"""
+        matches = {}
+        for match in self.pattern.finditer(text):
+            term = match.group(0)
+            matches.setdefault(self.term_categories[term], []).append((term, match.start()))
+        return matches
+
+POST_CLASSIFIER = KeywordClassifier({
+    'candidate': CANDIDATE_INDICATORS,
+    'non_us': NON_US_TERMS,
+    'us': US_TERMS,
+    'non_contract': NON_CONTRACT_TERMS,
+    'contract': CONTRACT_TERMS
+})
+
+ZIP_CODE_PATTERN = re.compile(r'\b\d{5}(?:-\d{4})?\b')
+
+# Used to normalize post text before hashing it
+URL_PATTERN = re.compile(r'https?://\S+')
+NORMALIZE_PATTERN = re.compile(r'[^a-z0-9@.+#]+')
+
+# Relative post timestamps as LinkedIn shows them ("5m", "3h", "1d", "2w", "3mo", "3 hours ago")
+POST_AGE_PATTERN = re.compile(
+    r'\b(\d+)\s*(mo(?:nths?|s)?|m(?:in(?:ute)?s?)?|h(?:ours?|rs?)?|d(?:ays?)?|w(?:eeks?|ks?)?|y(?:ears?|rs?)?|s(?:ec(?:ond)?s?)?)\b',
+    re.IGNORECASE
 )
+POST_AGE_UNITS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400, 'w': 604800, 'y': 31536000}
+
+def parse_post_age(text):
+    """Age in seconds from a post's relative timestamp, or None if it has none"""
+    if not text:
+        return None
+    match = POST_AGE_PATTERN.search(text)
+    if not match:
+        return 0 if 'now' in text.lower() else None
+    unit = match.group(2).lower()
+    seconds = 2592000 if unit.startswith('mo') else POST_AGE_UNITS[unit[0]]
+    return int(match.group(1)) * seconds
+
+# Words ignored when matching resume sections against a post
+PROMPT_STOPWORDS = {
+    'a', 'an', 'and', 'are', 'as', 'at', 'be', 'by', 'for', 'from', 'has', 'have', 'in', 'is', 'it', 'of',
+    'on', 'or', 'our', 'that', 'the', 'this', 'to', 'we', 'with', 'you', 'your', 'will', 'who', 'all',
+    'using', 'developed', 'implemented', 'experience', 'years', 'team', 'work', 'role', 'job', 'hiring'
+}
+# Skills job posts commonly ask for, so fit scoring can tell how much of a post's stack the resume
+# doesn't cover (terms as produced by PROMPT_WORD_PATTERN)
+JOB_SKILL_TERMS = {
+    'python', 'django', 'flask', 'fastapi', 'pandas', 'spark', 'pyspark', 'airflow', 'snowflake', 'databricks',
+    'hadoop', 'hive', 'kafka', 'scala', 'kotlin', 'golang', 'rust', 'ruby', 'rails', 'php', 'laravel', 'perl',
+    'c#', 'c++', 'dotnet', 'asp.net', 'azure', 'gcp', 'terraform', 'ansible', 'salesforce', 'apex', 'sap',
+    'abap', 'fico', 'hana', '4hana', 'servicenow', 'tableau', 'powerbi', 'informatica', 'etl', 'cobol',
+    'mainframe', 'vue', 'node.js', 'nodejs', 'graphql', 'swift', 'ios', 'android', 'flutter', 'selenium',
+    'cypress', 'redis', 'elasticsearch', 'cassandra', 'teradata', 'mulesoft', 'workday', 'peoplesoft',
+    'sharepoint', 'linux', 'devops', 'tensorflow', 'pytorch', 'java', 'spring', 'hibernate', 'aws', 'react',
+    'angular', 'typescript', 'javascript', 'sql', 'oracle', 'mysql', 'postgresql', 'mongodb', 'docker',
+    'kubernetes', 'jenkins', 'microservices'
+}
+PROMPT_WORD_PATTERN = re.compile(r'[a-z0-9][a-z0-9+#.]*[a-z0-9+#]|[a-z0-9]')
+PROMPT_SENTENCE_PATTERN = re.compile(r'\n+|(?<=[.!?])\s+')
+
+def prompt_terms(text):
+    return {word for word in PROMPT_WORD_PATTERN.findall(text.lower()) if word not in PROMPT_STOPWORDS}
+
+def estimate_tokens(text):
+    """Rough token count for English text (about four characters per token)"""
+    return (len(text) + 3) // 4
+
+class PromptBuilder:
+    """Build compact email prompts from relevant resume sections and deduplicated post text"""
+
+    def __init__(self, token_budget=1000, duplicate_threshold=0.8):
+        self.token_budget = token_budget
+        self.duplicate_threshold = duplicate_threshold
+        self.resume_source = None
+        self.resume_sections = []
+
+    def split_resume(self, resume):
+        """Split a resume into blocks under its upper-case headings, caching the result per resume text"""
+        if resume == self.resume_source:
+            return self.resume_sections
+        
+        sections = []
+        heading = None
+        block = []
+        
+        def flush():
+            text = '\n'.join(block).strip()
+            if heading and text:
+                sections.append({'heading': heading, 'text': text, 'terms': prompt_terms(text)})
+            block.clear()
+        
+        # Skip the header block (name and contact details are added to the prompt separately)
+        lines = resume.strip().splitlines()
+        while lines and lines[0].strip():
+            lines.pop(0)
+        
+        for line in lines:
+            stripped = line.strip()
+            if stripped.isupper() and len(stripped) > 3 and not stripped.startswith('•'):
+                flush()
+                heading = stripped
+            elif not stripped:
+                flush()
+            else:
+                block.append(stripped)
+        flush()
+        
+        # Terms found in most blocks (like 'java') say nothing about which block is relevant
+        frequency = {}
+        for section in sections:
+            for term in section['terms']:
+                frequency[term] = frequency.get(term, 0) + 1
+        for section in sections:
+            section['weights'] = {term: math.log(len(sections) / frequency[term]) for term in section['terms']
+                                  if frequency[term] <= len(sections) / 2}
+        
+        self.resume_source = resume
+        self.resume_sections = sections
+        return sections
+
+    def select_resume(self, resume, post_terms, budget):
+        """Keep the summary and skills, then the blocks that best match the post's skills, within budget"""
+        sections = self.split_resume(resume)
+        if not sections:
+            return resume, 0, 0
+        
+        always = lambda section: 'SUMMARY' in section['heading'] or 'SKILL' in section['heading']
+        score = lambda section: sum(weight for term, weight in section['weights'].items() if term in post_terms)
+        ranked = sorted(range(len(sections)), key=lambda i: (not always(sections[i]), -score(sections[i])))
+        chosen = set()
+        used = 0
+        for i in ranked:
+            section = sections[i]
+            if not always(section) and score(section) <= 0:
+                break
+            cost = estimate_tokens(section['text']) + 4
+            if used + cost > budget:
+                continue
+            chosen.add(i)
+            used += cost
+        
+        lines = []
+        heading = None
+        for i in sorted(chosen):
+            if sections[i]['heading'] != heading:
+                heading = sections[i]['heading']
+                lines.append(f"\n{heading}")
+            lines.append(sections[i]['text'])
+        return '\n'.join(lines).strip(), len(chosen), len(sections)
+
+    def dedupe_post_text(self, content, job_description, budget):
+        """Drop sentences that mostly repeat text already kept, then cut to the budget"""
+        kept = {'content': [], 'job_description': []}
+        seen = set()
+        total = 0
+        used = 0
+        for field, text in (('content', content), ('job_description', job_description)):
+            for sentence in PROMPT_SENTENCE_PATTERN.split(text):
+                sentence = sentence.strip()
+                if not sentence:
+                    continue
+                total += 1
+                words = sentence.lower().split()
+                shingles = {' '.join(words[i:i + 2]) for i in range(max(1, len(words) - 1))}
+                if len(shingles & seen) / len(shingles) >= self.duplicate_threshold:
+                    continue
+                cost = estimate_tokens(sentence) + 1
+                if used + cost > budget:
+                    continue
+                seen |= shingles
+                kept[field].append(sentence)
+                used += cost
+        return ' '.join(kept['content']), ' '.join(kept['job_description']), sum(map(len, kept.values())), total
+
+    def build(self, post_details, resume_content, position_type, user_name, user_phone, user_email):
+        """Return the prompt and a short description of what was kept"""
+        template = self.render(post_details['author'], '', '', '', position_type, user_name, user_phone, user_email)
+        available = max(0, self.token_budget - estimate_tokens(template))
+        
+        # Post text gets up to 60% of what is left; the resume gets the rest
+        content, job_description, kept_sentences, total_sentences = self.dedupe_post_text(
+            post_details['content'], post_details.get('job_description', ''), available * 3 // 5
+        )
+        resume_budget = available - estimate_tokens(content + job_description)
+        if resume_content and not resume_content.startswith('Resume found at'):
+            resume, kept_sections, total_sections = self.select_resume(
+                resume_content, prompt_terms(content + ' ' + job_description), resume_budget
+            )
+        else:
+            resume, kept_sections, total_sections = resume_content, 0, 0
+        
+        prompt = self.render(post_details['author'], content, job_description, resume,
+                             position_type, user_name, user_phone, user_email)
+        stats = {
+            'tokens': estimate_tokens(prompt),
+            'resume_sections': f"{kept_sections}/{total_sections}",
+            'post_sentences': f"{kept_sentences}/{total_sentences}"
+        }
+        return prompt, stats
+
+    @staticmethod
+    def render(author, content, job_description, resume_content, position_type, user_name, user_phone, user_email):
+        return f"""
+        Write a professional email response to a Java Developer {position_type} opportunity.
+        
+        Post Author: {author}
+        Post Content: {content}
+        Job Description: {job_description or 'Not provided'}
+        
+        My Resume Information:
+        {resume_content if resume_content else "Not provided, please use general Java developer experience"}
+        
+        Requirements:
+        1. Personalize based on the post content and job description
+        2. Keep it concise but professional
+        3. Express genuine interest in the opportunity
+        4. Highlight relevant Java development experience that matches the requirements mentioned in the job description
+        5. Emphasize that I am available for {position_type} roles
+        6. End with a call to action
+        7. Reference specific skills and requirements mentioned
+        8. Include company name and location if mentioned
+        9. Include my contact information at the end: Phone: {user_phone}, Email: {user_email}
+        10. Sign the email with my name: {user_name}
+        
+        Format:
+        Subject: [Your subject line]
+        
+        [Your email body]
+        
+        [Include my contact information and name at the end]
+        """
+
+class SkillIndex:
+    """Weighted skill terms from the resume, built once per resume text, for scoring how well a post fits"""
 
-class LinkedInPostAutomation:
     def __init__(self):
+        self.parser = PromptBuilder()
+        self.resume_source = None
+        self.weights = {}
+        self.missing_weight = 1.0
+
+    def build(self, resume):
+        """Index the skills sections, weighting each term by how often the resume mentions it"""
+        if resume == self.resume_source:
+            return self.weights
+        self.resume_source = resume
+        self.weights = {}
+        if not resume or resume.startswith('Resume found at'):
+            return self.weights
+        
+        sections = self.parser.split_resume(resume)
+        # Drop line labels such as "Languages:" so only the skills themselves are indexed
+        skills = set()
+        for section in sections:
+            if 'SKILL' in section['heading']:
+                for line in section['text'].splitlines():
+                    skills |= prompt_terms(line.split(':', 1)[-1])
+        counts = {}
+        for word in PROMPT_WORD_PATTERN.findall(resume.lower()):
+            counts[word] = counts.get(word, 0) + 1
+        if not skills:
+            # Without a skills section, fall back to terms the resume repeats
+            skills = {term for term in prompt_terms(resume) if counts.get(term, 0) > 1}
+        
+        self.weights = {term: 1 + math.log(counts.get(term, 1)) for term in skills if not term.isdigit()}
+        # A skill the post asks for that the resume lacks counts as much as an average resume skill
+        self.missing_weight = sum(self.weights.values()) / len(self.weights) if self.weights else 1.0
+        logging.info(f"Indexed {len(self.weights)} resume skills for fit scoring")
+        return self.weights
+
+    def score(self, text, resume):
+        """Share of the skills a post names that the resume covers, weighted, between 0 and 1; None without a readable resume"""
+        weights = self.build(resume)
+        if not weights:
+            return None
+        terms = prompt_terms(text)
+        matched = sum(weights[term] for term in terms if term in weights)
+        if not matched:
+            return 0.0
+        missing = sum(1 for term in terms if term in JOB_SKILL_TERMS and term not in weights)
+        return matched / (matched + missing * self.missing_weight)
+
+class StateStore:
+    """SQLite-backed store for responded posts and per-domain email history"""
+
+    def __init__(self, path='automation_state.db', commit_every=20):
+        self.path = path
+        self.commit_every = commit_every
+        self.pending_writes = 0
+        self.lock = threading.RLock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS responded_posts (
+                post_id TEXT PRIMARY KEY,
+                responded_at TEXT NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS email_history (
+                domain TEXT NOT NULL,
+                date TEXT NOT NULL,
+                email TEXT NOT NULL,
+                post_id TEXT,
+                PRIMARY KEY (domain, date)
+            );
+            CREATE TABLE IF NOT EXISTS meta (
+                key TEXT PRIMARY KEY,
+                value TEXT
+            );
+        """)
+        self.conn.commit()
+
+    def import_json_history(self, response_file, email_file):
+        """Import the legacy JSON history files the first time the store is opened"""
+        with self.lock:
+            if self.conn.execute("SELECT 1 FROM meta WHERE key = 'json_imported'").fetchone():
+                return
+            
+            responded_posts = []
+            email_history = {}
+            for path, target in ((response_file, 'responses'), (email_file, 'emails')):
+                try:
+                    if os.path.exists(path) and os.path.getsize(path) > 0:
+                        with open(path, 'r') as f:
+                            data = json.load(f)
+                        if target == 'responses':
+                            responded_posts = data.get('responded_posts', [])
+                        else:
+                            email_history = data
+                except Exception as e:
+                    logging.warning(f"Could not import {path}: {str(e)}")
+            
+            imported_at = datetime.now().isoformat()
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO responded_posts (post_id, responded_at) VALUES (?, ?)",
+                [(post_id, imported_at) for post_id in responded_posts]
+            )
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO email_history (domain, date, email, post_id) VALUES (?, ?, ?, ?)",
+                [(domain, entry.get('date', ''), entry.get('email', ''), entry.get('post_id'))
+                 for domain, entry in email_history.items()]
+            )
+            self.conn.execute("INSERT INTO meta (key, value) VALUES ('json_imported', ?)", (imported_at,))
+            self.conn.commit()
+            logging.info(f"Imported {len(responded_posts)} responded posts and {len(email_history)} email domains from JSON history")
+
+    def has_responded(self, post_id):
+        with self.lock:
+            return self.conn.execute("SELECT 1 FROM responded_posts WHERE post_id = ?", (post_id,)).fetchone() is not None
+
+    def has_emailed_domain(self, domain, date):
+        with self.lock:
+            return self.conn.execute(
+                "SELECT 1 FROM email_history WHERE domain = ? AND date = ?", (domain, date)
+            ).fetchone() is not None
+
+    def count_responses(self):
+        with self.lock:
+            return self.conn.execute("SELECT COUNT(*) FROM responded_posts").fetchone()[0]
+
+    def count_emails_on(self, date):
+        with self.lock:
+            return self.conn.execute("SELECT COUNT(*) FROM email_history WHERE date = ?", (date,)).fetchone()[0]
+
+    def record_response(self, post_id, email, date):
+        """Record a sent response, committing once enough writes have been batched"""
+        domain = email.split('@')[1]
+        with self.lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO responded_posts (post_id, responded_at) VALUES (?, ?)",
+                (post_id, datetime.now().isoformat())
+            )
+            self.conn.execute(
+                "INSERT OR REPLACE INTO email_history (domain, date, email, post_id) VALUES (?, ?, ?, ?)",
+                (domain, date, email, post_id)
+            )
+            self.pending_writes += 1
+            if self.pending_writes >= self.commit_every:
+                self.commit()
+
+    def commit(self):
+        with self.lock:
+            self.conn.commit()
+            self.pending_writes = 0
+
+    def close(self):
+        with self.lock:
+            self.conn.commit()
+            self.conn.close()
+
+class Settings:
+    """Config and resume loaded once, and reloaded only when their files change on disk"""
+
+    def __init__(self, config_file='config.json', resume_paths=None, check_interval=5):
+        self.config_file = config_file
+        self.resume_paths = resume_paths or ['resume.txt', 'resume.md', 'resume.docx', 'resume.pdf']
+        self.check_interval = check_interval
+        self.config = {}
+        self.resume_content = ""
+        self.resume_path = None
+        self.profile_version = ""
+        self.file_mtimes = {}
+        self.last_check = 0
+        self.lock = threading.Lock()
+        self.refresh(force=True)
+
+    def get(self, key, default=None):
+        self.refresh()
+        return self.config.get(key, default)
+
+    def resume(self):
+        self.refresh()
+        return self.resume_content
+
+    def refresh(self, force=False):
+        """Reload config and resume if their mtimes changed, checking at most every check_interval seconds"""
+        now = time.monotonic()
+        if not force and now - self.last_check < self.check_interval:
+            return
+        with self.lock:
+            self.last_check = now
+            
+            mtimes = {}
+            for path in [self.config_file] + self.resume_paths:
+                try:
+                    mtimes[path] = os.stat(path).st_mtime
+                except OSError:
+                    mtimes[path] = None
+            if mtimes == self.file_mtimes:
+                return
+            
+            changed = [path for path in mtimes if mtimes[path] != self.file_mtimes.get(path)]
+            self.file_mtimes = mtimes
+            if self.config_file in changed:
+                self.load_config_file()
+            if any(path in self.resume_paths for path in changed):
+                self.load_resume()
+            
+            # Identifies the profile generated emails were written for
+            profile = [self.resume_content] + [self.config.get(key, '') for key in ('user_name', 'user_phone', 'gmail_email')]
+            self.profile_version = hashlib.sha256(json.dumps(profile).encode('utf-8')).hexdigest()[:16]
+
+    def version(self):
+        self.refresh()
+        return self.profile_version
+
+    def load_config_file(self):
+        try:
+            if os.path.exists(self.config_file):
+                with open(self.config_file, 'r') as f:
+                    self.config = json.load(f)
+                logging.info(f"Loaded settings from {self.config_file}")
+        except Exception as e:
+            logging.warning(f"Could not load settings from {self.config_file}: {str(e)}")
+
+    def load_resume(self):
+        """Load resume content from the first resume file that exists"""
+        self.resume_content = ""
+        self.resume_path = None
+        for path in self.resume_paths:
+            if os.path.exists(path):
+                try:
+                    if path.endswith('.txt') or path.endswith('.md'):
+                        with open(path, 'r', encoding='utf-8') as f:
+                            self.resume_content = f.read()
+                        logging.info(f"Loaded resume from {path}")
+                    # For other formats, just note that we found it but can't read it directly
+                    else:
+                        self.resume_content = f"Resume found at {path} but content cannot be read directly."
+                        logging.info(f"Found resume at {path} but content cannot be read directly")
+                    self.resume_path = path
+                    break
+                except Exception as e:
+                    logging.warning(f"Could not read resume from {path}: {str(e)}")
+
+class SMTPTransport:
+    """SMTP connection that stays authenticated across sends and reconnects when dropped"""
+
+    def __init__(self, host='smtp.gmail.com', port=587, username=None, password=None,
+                 use_tls=True, idle_probe_after=60, timeout=30):
+        self.host = host
+        self.port = port
+        self.username = username
+        self.password = password
+        self.use_tls = use_tls
+        self.idle_probe_after = idle_probe_after
+        self.timeout = timeout
+        self.server = None
+        self.last_used = 0
+
+    def connect(self):
+        start = time.perf_counter()
+        server = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+        try:
+            if self.use_tls:
+                server.starttls()
+            if self.username:
+                server.login(self.username, self.password)
+        except Exception:
+            server.close()
+            raise
+        self.server = server
+        self.last_used = time.monotonic()
+        logging.info(f"Connected to SMTP server {self.host}:{self.port} in {(time.perf_counter() - start) * 1000:.0f} ms")
+
+    def ensure_connected(self):
+        """Connect if needed, NOOP-probing sessions that have sat idle"""
+        if self.server is None:
+            self.connect()
+            return
+        if time.monotonic() - self.last_used < self.idle_probe_after:
+            return
+        try:
+            code, _ = self.server.noop()
+            if code == 250:
+                self.last_used = time.monotonic()
+                return
+            logging.info(f"SMTP NOOP returned {code}, reconnecting")
+        except (smtplib.SMTPException, OSError) as e:
+            logging.info(f"Idle SMTP session is gone ({str(e)}), reconnecting")
+        self.reset()
+        self.connect()
+
+    def send(self, msg):
+        """Send a message, reconnecting once if the server dropped the session"""
+        start = time.perf_counter()
+        for attempt in range(2):
+            try:
+                self.ensure_connected()
+                self.server.send_message(msg)
+                self.last_used = time.monotonic()
+                break
+            except smtplib.SMTPServerDisconnected as e:
+                self.reset()
+                if attempt:
+                    raise
+                logging.warning(f"SMTP server disconnected ({str(e)}), retrying with a new connection")
+        logging.info(f"Sent email to {msg['To']} in {(time.perf_counter() - start) * 1000:.0f} ms")
+
+    def reset(self):
+        """Drop the current connection without a QUIT"""
+        if self.server is not None:
+            try:
+                self.server.close()
+            except Exception:
+                pass
+            self.server = None
+
+    def close(self):
+        if self.server is not None:
+            try:
+                self.server.quit()
+            except (smtplib.SMTPException, OSError):
+                pass
+            self.reset()
+
+class FitQueue:
+    """Qualified posts waiting for a response, handed out best fit first within per-cycle and per-day budgets"""
+
+    def __init__(self):
+        self.heap = []
+        self.sequence = 0
+        self.day = None
+        self.used_today = 0
+
+    def __len__(self):
+        return len(self.heap)
+
+    def push(self, score, job, max_size=200):
+        """Queue a job, dropping the worst-fitting ones once more than max_size are waiting"""
+        self.sequence += 1
+        heapq.heappush(self.heap, (-score, self.sequence, job))
+        if len(self.heap) > max_size:
+            self.heap = heapq.nsmallest(max_size, self.heap)
+            heapq.heapify(self.heap)
+
+    def pop(self):
+        score, _, job = heapq.heappop(self.heap)
+        return -score, job
+
+    def start_day(self, day, already_sent):
+        """Reset the daily budget on a new day, counting emails sent earlier that day"""
+        if day != self.day:
+            self.day = day
+            self.used_today = already_sent
+
+    def allowance(self, cycle_budget=0, daily_budget=0):
+        """How many posts may be handed out this cycle; a budget of 0 means unlimited"""
+        limits = [len(self.heap)]
+        if cycle_budget:
+            limits.append(cycle_budget)
+        if daily_budget:
+            limits.append(max(0, daily_budget - self.used_today))
+        return min(limits)
+
+class OutboundPipeline:
+    """Generate and send emails on worker threads so the browser loop never waits on OpenAI or SMTP"""
+
+    def __init__(self, bot, generation_workers=2, queue_size=10):
+        self.bot = bot
+        self.generate_queue = queue.Queue(maxsize=queue_size)
+        self.send_queue = queue.Queue(maxsize=queue_size)
+        self.lock = threading.Lock()
+        self.in_flight_posts = set()
+        self.in_flight_domains = set()
+        # Near-duplicate signatures of posts queued or being sent, keyed by post id
+        self.in_flight_signatures = {}
+        self.sent = 0
+        self.failed = 0
+        self.generators = [
+            threading.Thread(target=self._generate_loop, name=f"generate-{i + 1}", daemon=True)
+            for i in range(max(1, generation_workers))
+        ]
+        self.sender = threading.Thread(target=self._send_loop, name="send", daemon=True)
+
+    def start(self):
+        for worker in self.generators:
+            worker.start()
+        self.sender.start()
+
+    def submit(self, job):
+        """Queue a qualified post for generation; False if it or its domain is already in flight"""
+        with self.lock:
+            if job['post_id'] in self.in_flight_posts or job['email_domain'] in self.in_flight_domains:
+                return False
+            self.in_flight_posts.add(job['post_id'])
+            self.in_flight_domains.add(job['email_domain'])
+            if job.get('signature'):
+                self.in_flight_signatures[job['post_id']] = job['signature']
+        # Blocks while the queue is full, so scraping slows to the pace the workers can sustain
+        self.generate_queue.put(job)
+        return True
+
+    def _release(self, job, sent):
+        """Clear a finished job's in-flight entries and count its outcome"""
+        with self.lock:
+            self.in_flight_posts.discard(job['post_id'])
+            self.in_flight_domains.discard(job['email_domain'])
+            self.in_flight_signatures.pop(job['post_id'], None)
+            if sent:
+                self.sent += 1
+            else:
+                self.failed += 1
+
+    def _generate_loop(self):
+        while True:
+            job = self.generate_queue.get()
+            if job is None:
+                break
+            start = time.perf_counter()
+            try:
+                draft = self.bot.draft_email(job['post_data'])
+            except Exception as e:
+                logging.error(f"Error drafting email: {str(e)}", extra={'post_id': job['post_id'], 'stage': 'generate'})
+                draft = None
+            elapsed = time.perf_counter() - start
+            self.bot.metrics.observe('draft', elapsed)
+            logging.info(f"Drafted email for post {job['post_id']}" if draft else f"No draft for post {job['post_id']}", extra={
+                'post_id': job['post_id'], 'stage': 'generate', 'decision': 'drafted' if draft else 'failed',
+                'duration_ms': round(elapsed * 1000, 2)
+            })
+            if draft:
+                job['subject'], job['body'] = draft
+                self.send_queue.put(job)
+            else:
+                self._release(job, False)
+
+    def _send_loop(self):
+        while True:
+            job = self.send_queue.get()
+            if job is None:
+                break
+            start = time.perf_counter()
+            sent = False
+            # A failing job must not end the only send thread, or the generators block on a full queue
+            try:
+                recipient = job['post_data']['emails'][0]
+                sent = self.bot.send_email(recipient, job['subject'], job['body'], self.bot.email, self.bot.password)
+                if sent:
+                    self.bot.state.record_response(job['post_id'], recipient, job['date'])
+                    self.bot.near_duplicates.add(job['signature'], job['post_id'])
+            except Exception as e:
+                logging.error(f"Error sending response to post {job['post_id']}: {str(e)}",
+                              extra={'post_id': job['post_id'], 'stage': 'send'})
+            logging.info(f"{'Sent' if sent else 'Failed to send'} response to post {job['post_id']}", extra={
+                'post_id': job['post_id'], 'stage': 'send', 'decision': 'sent' if sent else 'failed',
+                'duration_ms': round((time.perf_counter() - start) * 1000, 2)
+            })
+            self._release(job, sent)
+
+    def pending(self):
+        return self.generate_queue.qsize() + self.send_queue.qsize()
+
+    def pending_signatures(self):
+        with self.lock:
+            return dict(self.in_flight_signatures)
+
+    def close(self):
+        """Let queued emails finish; a second Ctrl+C abandons whatever is left"""
+        logging.info(f"Draining outbound pipeline ({self.pending()} queued)")
+        try:
+            for _ in self.generators:
+                self.generate_queue.put(None)
+            for worker in self.generators:
+                worker.join()
+            self.send_queue.put(None)
+            self.sender.join()
+            logging.info(f"Outbound pipeline drained: {self.sent} sent, {self.failed} failed")
+        except KeyboardInterrupt:
+            logging.warning(f"Abandoning {self.pending()} queued emails")
+
+class EmailCache:
+    """Generated emails keyed by normalized post text and profile version, kept in the state store"""
+
+    def __init__(self, store, max_bytes=20 * 1024 * 1024, max_age_days=14):
+        self.store = store
+        self.max_bytes = max_bytes
+        self.max_age_days = max_age_days
+        self.hits = 0
+        self.misses = 0
+        self.miss_seconds = 0.0
+        with store.lock:
+            store.conn.execute("""
+                CREATE TABLE IF NOT EXISTS generated_emails (
+                    key TEXT PRIMARY KEY,
+                    subject TEXT NOT NULL,
+                    body TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    created_at REAL NOT NULL,
+                    last_used REAL NOT NULL
+                )
+            """)
+            store.conn.execute("CREATE INDEX IF NOT EXISTS idx_generated_emails_last_used ON generated_emails (last_used)")
+            store.conn.commit()
+        self.evict()
+
+    @staticmethod
+    def key_for(post_data, profile_version):
+        """Hash the normalized post content and job description together with the profile version"""
+        normalize = lambda text: ' '.join(NORMALIZE_PATTERN.sub(' ', URL_PATTERN.sub(' ', text.lower())).split())
+        parts = [
+            normalize(post_data.get('content', '')),
+            normalize(post_data.get('job_description', '')),
+            'contract' if post_data.get('is_contract') else 'full-time',
+            profile_version
+        ]
+        return hashlib.sha256('\n'.join(parts).encode('utf-8')).hexdigest()
+
+    def get(self, key):
+        with self.store.lock:
+            row = self.store.conn.execute(
+                "SELECT subject, body FROM generated_emails WHERE key = ? AND created_at >= ?",
+                (key, time.time() - self.max_age_days * 86400)
+            ).fetchone()
+            if row:
+                self.hits += 1
+                self.store.conn.execute("UPDATE generated_emails SET last_used = ? WHERE key = ?", (time.time(), key))
+            return row
+
+    def put(self, key, subject, body, generation_seconds):
+        now = time.time()
+        with self.store.lock:
+            self.misses += 1
+            self.miss_seconds += generation_seconds
+            self.store.conn.execute(
+                "INSERT OR REPLACE INTO generated_emails (key, subject, body, size, created_at, last_used) VALUES (?, ?, ?, ?, ?, ?)",
+                (key, subject, body, len(subject.encode('utf-8')) + len(body.encode('utf-8')), now, now)
+            )
+            self.evict()
+            self.store.conn.commit()
+
+    def evict(self):
+        """Drop expired entries, then least recently used ones until the cache fits in max_bytes"""
+        with self.store.lock:
+            conn = self.store.conn
+            conn.execute("DELETE FROM generated_emails WHERE created_at < ?", (time.time() - self.max_age_days * 86400,))
+            total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM generated_emails").fetchone()[0]
+            if total > self.max_bytes:
+                for key, size in conn.execute("SELECT key, size FROM generated_emails ORDER BY last_used").fetchall():
+                    conn.execute("DELETE FROM generated_emails WHERE key = ?", (key,))
+                    total -= size
+                    if total <= self.max_bytes:
+                        break
+
+    def summary(self):
+        lookups = self.hits + self.misses
+        hit_rate = self.hits / lookups * 100 if lookups else 0
+        average = self.miss_seconds / self.misses if self.misses else 0
+        return (f"Email cache: {self.hits} hits, {self.misses} misses ({hit_rate:.0f}% hit rate), "
+                f"~{self.hits * average:.1f}s of generation saved")
+
+class Metrics:
+    """Per-stage latency histograms and event counters, written out in Prometheus text format"""
+
+    def __init__(self, path='automation_metrics.prom', write_interval=30, sample_size=2048):
+        self.path = path
+        self.write_interval = write_interval
+        self.sample_size = sample_size
+        self.lock = threading.Lock()
+        self.samples = {}
+        self.totals = {}
+        self.counters = {}
+        self.last_write = time.monotonic()
+
+    @contextmanager
+    def timer(self, stage):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(stage, time.perf_counter() - start)
+
+    def observe(self, stage, seconds):
+        """Record one duration; percentiles come from the most recent sample_size observations"""
+        with self.lock:
+            if stage not in self.samples:
+                self.samples[stage] = deque(maxlen=self.sample_size)
+                self.totals[stage] = [0, 0.0, 0.0]
+            self.samples[stage].append(seconds)
+            totals = self.totals[stage]
+            totals[0] += 1
+            totals[1] += seconds
+            totals[2] = max(totals[2], seconds)
+
+    def increment(self, name, amount=1, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self.lock:
+            self.counters[key] = self.counters.get(key, 0) + amount
+
+    @staticmethod
+    def quantile(ordered, fraction):
+        return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+    def snapshot(self):
+        """Copy out each stage's (p50, p95, max, count, total) and the counters"""
+        with self.lock:
+            stages = {}
+            for stage, samples in self.samples.items():
+                ordered = sorted(samples)
+                count, total, maximum = self.totals[stage]
+                stages[stage] = (self.quantile(ordered, 0.5), self.quantile(ordered, 0.95), maximum, count, total)
+            return stages, sorted(self.counters.items())
+
+    def render(self):
+        """Format every histogram and counter in the Prometheus text exposition format"""
+        stages, counters = self.snapshot()
+        lines = ["# TYPE linkedin_stage_seconds summary"]
+        for stage, (p50, p95, maximum, count, total) in sorted(stages.items()):
+            lines.append(f'linkedin_stage_seconds{{stage="{stage}",quantile="0.5"}} {p50:.6f}')
+            lines.append(f'linkedin_stage_seconds{{stage="{stage}",quantile="0.95"}} {p95:.6f}')
+            lines.append(f'linkedin_stage_seconds_sum{{stage="{stage}"}} {total:.6f}')
+            lines.append(f'linkedin_stage_seconds_count{{stage="{stage}"}} {count}')
+        lines.append("# TYPE linkedin_stage_seconds_max gauge")
+        for stage, (_, _, maximum, _, _) in sorted(stages.items()):
+            lines.append(f'linkedin_stage_seconds_max{{stage="{stage}"}} {maximum:.6f}')
+        
+        declared = set()
+        for (name, labels), value in counters:
+            if name not in declared:
+                lines.append(f"# TYPE linkedin_{name}_total counter")
+                declared.add(name)
+            label_text = ",".join(f'{key}="{label}"' for key, label in labels)
+            lines.append(f"linkedin_{name}_total{{{label_text}}} {value}" if label_text else f"linkedin_{name}_total {value}")
+        return "\n".join(lines) + "\n"
+
+    def write(self):
+        """Replace the metrics file atomically so a scraper never reads a partial file"""
+        try:
+            temp_path = self.path + '.tmp'
+            with open(temp_path, 'w') as f:
+                f.write(self.render())
+            os.replace(temp_path, self.path)
+        except OSError as e:
+            logging.warning(f"Could not write metrics to {self.path}: {str(e)}")
+        self.last_write = time.monotonic()
+
+    def maybe_write(self):
+        if time.monotonic() - self.last_write >= self.write_interval:
+            self.write()
+
+    def summary(self):
+        stages, counters = self.snapshot()
+        lines = ["Stage timings (p50 / p95 / max):"]
+        for stage, (p50, p95, maximum, count, total) in sorted(stages.items(), key=lambda item: -item[1][4]):
+            lines.append(f"  {stage:<12} {p50 * 1000:8.0f} ms {p95 * 1000:8.0f} ms {maximum * 1000:8.0f} ms  "
+                         f"({count} calls, {total:.1f}s total)")
+        if counters:
+            lines.append("Counters: " + ", ".join(
+                f"{name}{'[' + ','.join(str(label) for _, label in labels) + ']' if labels else ''}={value}"
+                for (name, labels), value in counters
+            ))
+        return "\n".join(lines)
+
+class ArtifactStore:
+    """Debug page sources and screenshots, written by a background thread into a bounded ring buffer"""
+
+    def __init__(self, directory='debug_artifacts', max_files=50, max_bytes=50 * 1024 * 1024, sample_rate=0.05, queue_size=8):
+        self.directory = directory
+        self.max_files = max_files
+        self.max_bytes = max_bytes
+        self.sample_rate = sample_rate
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+        
+        # Pick up files kept by earlier runs, oldest first, so the caps cover them too
+        self.files = []
+        for entry in sorted(os.scandir(directory), key=lambda entry: entry.stat().st_mtime):
+            if entry.is_file() and not entry.name.endswith('.tmp'):
+                self.files.append((entry.path, entry.stat().st_size, entry.name.startswith('failure_')))
+        self.total_bytes = sum(size for _, size, _ in self.files)
+        
+        self.writer = threading.Thread(target=self._write_loop, name="artifacts", daemon=True)
+        self.writer.start()
+
+    def capture(self, driver, name, kind='page_source', failure=False):
+        """Grab a page source or screenshot on the calling thread and queue it for writing.
+
+        Failures are always captured; other captures only at sample_rate. Returns the path the
+        artifact will be written to, or None if it was skipped.
+        """
+        if not failure and random.random() >= self.sample_rate:
+            return None
+        try:
+            if kind == 'screenshot':
+                data, extension = driver.get_screenshot_as_png(), '.png'
+            else:
+                data, extension = driver.page_source.encode('utf-8'), '.html.gz'
+        except Exception as e:
+            logging.warning(f"Could not capture {kind} for {name}: {str(e)}")
+            return None
+        
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S_%f")
+        path = os.path.join(self.directory, f"{'failure' if failure else 'sample'}_{name}_{timestamp}{extension}")
+        try:
+            self.queue.put_nowait((path, data))
+        except queue.Full:
+            logging.warning(f"Artifact writer is behind, dropped {os.path.basename(path)}")
+            return None
+        return path
+
+    def _write_loop(self):
+        while True:
+            item = self.queue.get()
+            if item is None:
+                break
+            path, data = item
+            try:
+                # Page sources compress well; PNG screenshots are already compressed and are written as-is
+                temp_path = path + '.tmp'
+                if path.endswith('.gz'):
+                    with gzip.open(temp_path, 'wb', compresslevel=6) as f:
+                        f.write(data)
+                else:
+                    with open(temp_path, 'wb') as f:
+                        f.write(data)
+                os.replace(temp_path, path)
+                size = os.path.getsize(path)
+                with self.lock:
+                    self.files.append((path, size, os.path.basename(path).startswith('failure_')))
+                    self.total_bytes += size
+                    self._evict()
+                logging.info(f"Saved debug artifact {path} ({len(data) / 1024:.0f} KB -> {size / 1024:.0f} KB)")
+            except OSError as e:
+                logging.error(f"Error saving debug artifact {path}: {str(e)}")
+
+    def _evict(self):
+        """Delete the oldest artifacts until within the count and byte caps, sampled ones before failures"""
+        while self.files and (len(self.files) > self.max_files or self.total_bytes > self.max_bytes):
+            victim = next((entry for entry in self.files if not entry[2]), self.files[0])
+            self.files.remove(victim)
+            self.total_bytes -= victim[1]
+            try:
+                os.remove(victim[0])
+            except OSError:
+                pass
+
+    def close(self):
+        """Finish writing queued artifacts"""
+        self.queue.put(None)
+        self.writer.join(timeout=30)
+
+class NearDuplicateIndex:
+    """MinHash signatures of handled posts with LSH banding, so near-duplicate lookups stay sublinear"""
+    HASHES = 32
+    ROWS_PER_BAND = 4
+    # Two 64-byte blake2b digests per shingle give the 32 independent 32-bit hash values
+    SEEDS = (b'minhash-0', b'minhash-1')
+
+    def __init__(self, store, threshold=0.7, window_days=14):
+        # 8 bands of 4 rows make posts with ~70% shingle overlap collide in some band ~90% of the time
+        self.store = store
+        self.threshold = threshold
+        self.window_days = window_days
+        self.bands = self.HASHES // self.ROWS_PER_BAND
+        self.buckets = [{} for _ in range(self.bands)]
+        self.signatures = {}
+        self.last_prune = time.time()
+        # Lookups run on the browser loop while the send worker adds signatures
+        self.lock = threading.Lock()
+        with store.lock:
+            store.conn.execute("""
+                CREATE TABLE IF NOT EXISTS post_fingerprints (
+                    post_id TEXT PRIMARY KEY,
+                    signature BLOB NOT NULL,
+                    seen_at REAL NOT NULL
+                )
+            """)
+            store.conn.execute("DELETE FROM post_fingerprints WHERE seen_at < ?", (self.cutoff(),))
+            store.conn.commit()
+            for post_id, signature, seen_at in store.conn.execute("SELECT post_id, signature, seen_at FROM post_fingerprints"):
+                self._insert(post_id, bytes(signature), seen_at)
+
+    @classmethod
+    def signature(cls, text):
+        """MinHash signature (packed 32-bit values) of the word pairs in text, ignoring URLs and email addresses"""
+        text = EMAIL_VALID_PATTERN.sub(' ', URL_PATTERN.sub(' ', text.lower()))
+        words = PROMPT_WORD_PATTERN.findall(text)
+        shingles = {' '.join(words[i:i + 2]) for i in range(max(1, len(words) - 1))}
+        rows = []
+        for shingle in shingles:
+            data = shingle.encode('utf-8')
+            digest = b''.join(hashlib.blake2b(data, digest_size=64, person=seed).digest() for seed in cls.SEEDS)
+            rows.append(struct.unpack(f'>{cls.HASHES}I', digest[:cls.HASHES * 4]))
+        return struct.pack(f'>{cls.HASHES}I', *map(min, zip(*rows)))
+
+    def band_keys(self, signature):
+        width = self.ROWS_PER_BAND * 4
+        return [signature[band * width:(band + 1) * width] for band in range(self.bands)]
+
+    def cutoff(self):
+        return time.time() - self.window_days * 86400
+
+    def _insert(self, post_id, signature, seen_at):
+        self.signatures[post_id] = (signature, seen_at)
+        for band, key in enumerate(self.band_keys(signature)):
+            self.buckets[band].setdefault(key, []).append(post_id)
+
+    def similar(self, values, candidate):
+        matching = sum(a == b for a, b in zip(values, struct.unpack(f'>{self.HASHES}I', candidate)))
+        return matching / self.HASHES >= self.threshold
+
+    def find(self, signature, pending=None):
+        """Return the id of a handled post, or of a pending one (post id -> signature, email not sent yet), similar enough to signature"""
+        cutoff = self.cutoff()
+        values = struct.unpack(f'>{self.HASHES}I', signature)
+        checked = set()
+        with self.lock:
+            for band, key in enumerate(self.band_keys(signature)):
+                for post_id in self.buckets[band].get(key, ()):
+                    if post_id in checked or post_id not in self.signatures:
+                        continue
+                    checked.add(post_id)
+                    candidate, seen_at = self.signatures[post_id]
+                    if seen_at >= cutoff and self.similar(values, candidate):
+                        return post_id
+        for post_id, candidate in (pending or {}).items():
+            if self.similar(values, candidate):
+                return post_id
+        return None
+
+    def add(self, signature, post_id):
+        seen_at = time.time()
+        with self.lock:
+            self._insert(post_id, signature, seen_at)
+        with self.store.lock:
+            self.store.conn.execute(
+                "INSERT OR REPLACE INTO post_fingerprints (post_id, signature, seen_at) VALUES (?, ?, ?)",
+                (post_id, signature, seen_at)
+            )
+        if seen_at - self.last_prune > 3600:
+            self.prune()
+
+    def prune(self):
+        """Drop signatures that have aged out of the window, in memory and on disk"""
+        cutoff = self.cutoff()
+        with self.lock:
+            expired = {post_id for post_id, (_, seen_at) in self.signatures.items() if seen_at < cutoff}
+            if expired:
+                for post_id in expired:
+                    del self.signatures[post_id]
+                for buckets in self.buckets:
+                    for key in list(buckets):
+                        kept = [post_id for post_id in buckets[key] if post_id not in expired]
+                        if kept:
+                            buckets[key] = kept
+                        else:
+                            del buckets[key]
+        with self.store.lock:
+            self.store.conn.execute("DELETE FROM post_fingerprints WHERE seen_at < ?", (cutoff,))
+        self.last_prune = time.time()
+
+class SelectorRegistry:
+    """Remembers which selector found each UI target so later lookups try it first"""
+
+    def __init__(self, store, demote_after=2):
+        self.store = store
+        self.demote_after = demote_after
+        self.stats = {}
+        with store.lock:
+            store.conn.execute("""
+                CREATE TABLE IF NOT EXISTS selector_stats (
+                    target TEXT NOT NULL,
+                    selector TEXT NOT NULL,
+                    hits INTEGER NOT NULL,
+                    failures INTEGER NOT NULL,
+                    last_success REAL NOT NULL,
+                    PRIMARY KEY (target, selector)
+                )
+            """)
+            store.conn.commit()
+            for target, selector, hits, failures, last_success in store.conn.execute(
+                    "SELECT target, selector, hits, failures, last_success FROM selector_stats"):
+                self.stats[(target, selector)] = [hits, failures, last_success]
+
+    def order(self, target, selectors):
+        """Return selectors with the most recently successful first and repeatedly failing ones last"""
+        def rank(item):
+            index, selector = item
+            hits, failures, last_success = self.stats.get((target, selector), (0, 0, 0))
+            if failures >= self.demote_after:
+                return (2, index)
+            if hits:
+                return (0, -last_success, -hits)
+            return (1, index)
+        return [selector for _, selector in sorted(enumerate(selectors), key=rank)]
+
+    def record(self, target, selector, success):
+        """Count a hit (clearing earlier failures) or a consecutive failure for a selector"""
+        stats = self.stats.setdefault((target, selector), [0, 0, 0])
+        if success:
+            stats[0] += 1
+            stats[1] = 0
+            stats[2] = time.time()
+        else:
+            stats[1] += 1
+        with self.store.lock:
+            self.store.conn.execute(
+                "INSERT OR REPLACE INTO selector_stats (target, selector, hits, failures, last_success) VALUES (?, ?, ?, ?, ?)",
+                (target, selector, *stats)
+            )
+
+# Starts a settle wait: empties the resource-timing buffer (Chrome stops recording once its 250
+# entries are full, which LinkedIn's single-page app reaches quickly) and counts DOM mutations, so
+# both network activity and re-renders after the wait began are visible to PAGE_ACTIVITY_SCRIPT.
+PAGE_ACTIVITY_RESET_SCRIPT = """
+performance.clearResourceTimings();
+if (!window.__automationMutationObserver && document.body) {
+    window.__automationMutations = 0;
+    window.__automationMutationObserver = new MutationObserver(records => {
+        window.__automationMutations += records.length;
+    });
+    window.__automationMutationObserver.observe(document.body, {childList: true, subtree: true});
+}
+"""
+
+PAGE_ACTIVITY_SCRIPT = """
+return [document.readyState, performance.getEntriesByType('resource').length, window.__automationMutations || 0];
+"""
+
+DROPDOWN_OPEN_SCRIPT = """
+if (arguments[0].getAttribute('aria-expanded') === 'true') return true;
+const menus = document.querySelectorAll('.artdeco-dropdown__content--is-open, .artdeco-dropdown__content[aria-hidden="false"], [role="menu"], [role="listbox"]');
+return Array.from(menus).some(menu => menu.offsetParent !== null);
+"""
+
+POST_COUNT_SCRIPT = """
+for (const selector of arguments[0]) {
+    const count = document.querySelectorAll(selector).length;
+    if (count) return count;
+}
+return 0;
+"""
+
+class WaitStrategy:
+    """Condition-based waits that return as soon as the page reacts and record how long each took"""
+    
+    def __init__(self, driver, timeout=10, poll_frequency=0.2, quiet_period=0.5):
+        self.driver = driver
+        self.timeout = timeout
+        self.poll_frequency = poll_frequency
+        self.quiet_period = quiet_period
+        self.durations = {}
+        self.timeouts = {}
+
+    def until(self, label, condition, timeout=None):
+        """Wait for condition(driver) to be truthy, returning its value or None on timeout"""
+        timeout = timeout or self.timeout
+        start = time.perf_counter()
+        try:
+            result = WebDriverWait(self.driver, timeout, poll_frequency=self.poll_frequency).until(condition)
+        except TimeoutException:
+            result = None
+            self.timeouts[label] = self.timeouts.get(label, 0) + 1
+        elapsed = time.perf_counter() - start
+        self.durations.setdefault(label, []).append(elapsed)
+        logging.debug(f"Waited {elapsed:.2f}s for {label}{'' if result is not None else ' (timed out)'}")
+        return result
+
+    def settled(self, label, timeout=None):
+        """Wait until the document has loaded and no network requests or DOM changes happened for quiet_period"""
+        activity = {'counts': None, 'since': 0}
+        try:
+            self.driver.execute_script(PAGE_ACTIVITY_RESET_SCRIPT)
+        except Exception as e:
+            logging.debug(f"Could not reset page activity counters: {str(e)}")
+        
+        def condition(driver):
+            state, resources, mutations = driver.execute_script(PAGE_ACTIVITY_SCRIPT)
+            now = time.perf_counter()
+            if state != 'complete' or (resources, mutations) != activity['counts']:
+                activity['counts'], activity['since'] = (resources, mutations), now
+                return False
+            return now - activity['since'] >= self.quiet_period
+        
+        return self.until(label, condition, timeout)
+
+    def dropdown_open(self, label, trigger, timeout=3):
+        """Wait until a dropdown trigger reports itself expanded or a menu becomes visible"""
+        return self.until(label, lambda driver: driver.execute_script(DROPDOWN_OPEN_SCRIPT, trigger), timeout)
+
+    def post_count_above(self, label, previous_total, timeout=5):
+        """Wait until more post containers are on the page than previous_total"""
+        return self.until(
+            label,
+            lambda driver: driver.execute_script(POST_COUNT_SCRIPT, POST_SELECTORS) > previous_total,
+            timeout
+        )
+
+    def reset(self):
+        self.durations = {}
+        self.timeouts = {}
+
+    def summary(self):
+        parts = []
+        for label, durations in sorted(self.durations.items(), key=lambda item: -sum(item[1])):
+            timeouts = self.timeouts.get(label, 0)
+            parts.append(f"{label} {len(durations)}x {sum(durations):.1f}s (max {max(durations):.1f}s"
+                         f"{f', {timeouts} timed out' if timeouts else ''})")
+        total = sum(sum(durations) for durations in self.durations.values())
+        return f"Waits: {total:.1f}s total - " + ("; ".join(parts) if parts else "none")
+
+def create_chrome_driver(lean=False, profile_dir=None):
+    """Start Chrome, optionally headless with image, media and font requests blocked, and on a persistent profile"""
+    chrome_options = Options()
+    if profile_dir:
+        chrome_options.add_argument(f"--user-data-dir={os.path.abspath(profile_dir)}")
+    chrome_options.add_argument("--no-sandbox")
+    chrome_options.add_argument("--disable-dev-shm-usage")
+    chrome_options.add_argument("--disable-notifications")
+    if lean:
+        for argument in LEAN_BROWSER_ARGUMENTS:
+            chrome_options.add_argument(argument)
+        chrome_options.add_experimental_option("prefs", {"profile.managed_default_content_settings.images": 2})
+    else:
+        chrome_options.add_argument("--start-maximized")
+    
+    driver = webdriver.Chrome(options=chrome_options)
+    if lean:
+        driver.execute_cdp_cmd('Network.enable', {})
+        driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': BLOCKED_RESOURCE_PATTERNS})
+    return driver
+
+def process_tree_memory_mb(root_pid):
+    """Summed resident memory in MB of a process and its descendants, or None where /proc is unavailable"""
+    if not os.path.isdir('/proc'):
+        return None
+    children = {}
+    for entry in os.listdir('/proc'):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f'/proc/{entry}/stat') as f:
+                parent = int(f.read().rsplit(')', 1)[1].split()[1])
+            children.setdefault(parent, []).append(int(entry))
+        except (OSError, ValueError, IndexError):
+            continue
+    pages = 0
+    pending = [root_pid]
+    while pending:
+        pid = pending.pop()
+        try:
+            with open(f'/proc/{pid}/statm') as f:
+                pages += int(f.read().split()[1])
+        except (OSError, ValueError, IndexError):
+            pass
+        pending.extend(children.get(pid, []))
+    return pages * os.sysconf('SC_PAGE_SIZE') / (1024 * 1024)
+
+def measure_browser(url, loads=3):
+    """Load a page repeatedly in the standard and lean browser and compare load time, transfer and memory"""
+    results = {}
+    for lean in (False, True):
+        profile = 'lean' if lean else 'standard'
+        driver = create_chrome_driver(lean)
+        try:
+            driver.execute_cdp_cmd('Performance.enable', {})
+            samples = []
+            for _ in range(loads):
+                driver.get(url)
+                samples.append(driver.execute_script(PAGE_LOAD_METRICS_SCRIPT))
+            heap = {metric['name']: metric['value'] for metric in driver.execute_cdp_cmd('Performance.getMetrics', {})['metrics']}
+            memory = process_tree_memory_mb(driver.service.process.pid)
+            results[profile] = {
+                'load_ms': sum(sample['load_ms'] for sample in samples) / loads,
+                'requests': sum(sample['requests'] for sample in samples) / loads,
+                'transfer_kb': sum(sample['transfer_kb'] for sample in samples) / loads,
+                'js_heap_mb': heap.get('JSHeapUsedSize', 0) / (1024 * 1024),
+                'browser_rss_mb': memory
+            }
+        finally:
+            driver.quit()
+        print(f"{profile:>8}: load {results[profile]['load_ms']:.0f} ms, {results[profile]['requests']:.0f} requests, "
+              f"{results[profile]['transfer_kb']:.0f} KB transferred, JS heap {results[profile]['js_heap_mb']:.1f} MB, "
+              f"browser RSS {'n/a' if memory is None else f'{memory:.0f} MB'}")
+    return results
+
+def current_memory_mb():
+    """Resident memory of this process in MB, or peak resident memory where /proc is unavailable"""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / (1024 * 1024)
+    except (OSError, ValueError, AttributeError):
+        pass
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+    except ImportError:
+        return 0.0
+
+class SearchTermQueue:
+    """Weighted search terms, interleaved by weight or by each term's share of qualified posts"""
+
+    def __init__(self, terms, strategy='round_robin'):
+        self.terms = terms
+        self.strategy = strategy
+        self.credit = {term: 0.0 for term in terms}
+        self.stats = {term: {'cycles': 0, 'seen': 0, 'qualified': 0} for term in terms}
+
+    @classmethod
+    def from_settings(cls, settings):
+        """Build the queue from search_terms entries given as strings or {"term", "weight"} objects"""
+        terms = {}
+        for entry in settings.get('search_terms') or ["java developer"]:
+            if isinstance(entry, dict):
+                terms[entry['term']] = float(entry.get('weight', 1))
+            else:
+                terms[entry] = 1.0
+        return cls(terms, settings.get('search_strategy', 'round_robin'))
+
+    def effective_weight(self, term):
+        if self.strategy != 'yield':
+            return self.terms[term]
+        stats = self.stats[term]
+        # Smoothed so new and unlucky terms keep getting a share of cycles
+        return self.terms[term] * (stats['qualified'] + 1) / (stats['seen'] + 2)
+
+    def next(self):
+        """Pick the next term by smooth weighted round-robin"""
+        weights = {term: self.effective_weight(term) for term in self.terms}
+        for term, weight in weights.items():
+            self.credit[term] += weight
+        term = max(self.credit, key=self.credit.get)
+        self.credit[term] -= sum(weights.values())
+        return term
+
+    def record(self, term, result):
+        stats = self.stats[term]
+        stats['cycles'] += 1
+        if result:
+            stats['seen'] += result['posts_seen']
+            stats['qualified'] += result['posts_processed']
+
+    def summary(self):
+        lines = ["Search term yield:"]
+        for term, stats in self.stats.items():
+            rate = stats['qualified'] / stats['seen'] * 100 if stats['seen'] else 0
+            lines.append(f"  {term!r}: {stats['cycles']} cycles, {stats['seen']} posts seen, "
+                         f"{stats['qualified']} qualified ({rate:.1f}%)")
+        return "\n".join(lines)
+
+class SearchScheduler:
+    """Runs search cycles in a loop, pacing them and backing off exponentially after failures"""
+
+    def __init__(self, bot):
+        self.bot = bot
+        self.cycle = 0
+        self.consecutive_failures = 0
+        self.baseline_memory = None
+
+    def next_delay(self):
+        """Seconds to wait before the next cycle: the configured interval, or a backoff after failures"""
+        settings = self.bot.settings
+        if not self.consecutive_failures:
+            return settings.get('cycle_interval', 10)
+        backoff = min(settings.get('error_backoff_max', 600),
+                      settings.get('error_backoff_base', 30) * 2 ** (self.consecutive_failures - 1))
+        return backoff + random.uniform(0, backoff * 0.1)
+
+    def run(self, terms):
+        print("\nStarting continuous search mode - press Ctrl+C to stop")
+        try:
+            while True:
+                self.cycle += 1
+                search_term = terms.next()
+                logging.info(f"Search cycle {self.cycle}: {search_term!r}")
+                start = time.perf_counter()
+                result = None
+                try:
+                    result = self.bot.search_and_process_posts(search_term)
+                    self.consecutive_failures = 0
+                except Exception as e:
+                    self.consecutive_failures += 1
+                    logging.error(f"Search cycle {self.cycle} failed ({self.consecutive_failures} in a row): {str(e)}")
+                terms.record(search_term, result)
+                delay = self.next_delay()
+                self.report(result, time.perf_counter() - start, delay)
+                logging.info(terms.summary())
+                time.sleep(delay)
+        except KeyboardInterrupt:
+            print("\nSearch stopped by user")
+
+    def report(self, result, elapsed, delay):
+        """Log the cycle outcome and process memory, collecting garbage first so growth reflects real leaks"""
+        gc.collect()
+        memory = current_memory_mb()
+        if self.baseline_memory is None:
+            self.baseline_memory = memory
+        outcome = (f"{result['posts_sent']} answered, {result['posts_processed']} qualified from {result['posts_seen']} posts" if result
+                   else "failed")
+        logging.info(f"Cycle {self.cycle} {outcome} in {elapsed:.0f}s; memory {memory:.0f} MB "
+                     f"({memory - self.baseline_memory:+.1f} MB since cycle 1); next cycle in {delay:.0f}s")
+
+class LinkedInPostAutomation:
+    def __init__(self, settings=None, state_file='automation_state.db'):
+        self.settings = settings or Settings()
         self.driver = None
         self.email = None
         self.password = None
         self.openai_client = None
-        self.responded_posts = set()
+        self.smtp = None
+        self.pipeline = None
+        self.email_cache = None
+        self.selectors = None
+        self.near_duplicates = None
+        self.skills = SkillIndex()
+        self.fit_queue = FitQueue()
+        self.prompt_builder = PromptBuilder(self.settings.get('prompt_token_budget', 1000))
+        self.state = None
+        self.waits = None
+        self.last_page_total = 0
+        self.sorted_by_date = False
+        self.seen_posts = OrderedDict()
+        self.metrics = Metrics(self.settings.get('metrics_file', 'automation_metrics.prom'),
+                               self.settings.get('metrics_interval', 30))
+        self.logged_in = False
+        self.artifacts = None
+        self.state_file = state_file
         self.history_file = 'response_history.json'
+        self.email_history_file = 'email_history.json'
         self.load_response_history()
         self.max_retries = 3
         self.wait_time = 10
@@ -67,25 +1967,66 @@ class LinkedInPostAutomation:
                 time.sleep(2)
         return False
 
+    def click_and_wait(self, element, label, expect='results'):
+        """Click an element via JavaScript, then wait for a dropdown to open or the results to settle"""
+        self.driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", element)
+        self.driver.execute_script("arguments[0].click();", element)
+        if expect == 'dropdown':
+            return self.waits.dropdown_open(label, element)
+        return self.waits.settled(label)
+
+    def click_target(self, target, expect='results'):
+        """Click a search-page control, trying the selector that last found it before the fallbacks"""
+        candidates = {selector: (by, keywords) for by, selector, keywords in UI_TARGETS[target]}
+        for attempt, selector in enumerate(self.selectors.order(target, list(candidates)), 1):
+            by, keywords = candidates[selector]
+            try:
+                for element in self.driver.find_elements(by, selector):
+                    if element.is_displayed() and self.element_mentions(element, keywords):
+                        self.click_and_wait(element, target, expect)
+                        self.selectors.record(target, selector, True)
+                        logging.info(f"Clicked {target} with {'XPath' if by == By.XPATH else 'selector'}: {selector} "
+                                     f"(lookup {attempt}/{len(candidates)})")
+                        return True
+            except Exception as e:
+                logging.debug(f"Failed to click {target} with {selector}: {str(e)}")
+            self.selectors.record(target, selector, False)
+        logging.warning(f"Could not find {target} with any of {len(candidates)} selectors")
+        return False
+
+    @staticmethod
+    def element_mentions(element, keywords):
+        """Check whether an element's text or aria-label contains one of the keywords"""
+        if not keywords:
+            return True
+        text = element.text.lower() + " " + (element.get_attribute("aria-label") or "").lower()
+        return any(keyword in text for keyword in keywords)
+
     def load_response_history(self):
-        """Load previously responded posts from history file"""
+        """Open the state store, importing the legacy JSON history files on first run"""
         try:
-            if os.path.exists(self.history_file):
-                with open(self.history_file, 'r') as f:
-                    history = json.load(f)
-                    self.responded_posts = set(history.get('responded_posts', []))
-                    logging.info(f"Loaded {len(self.responded_posts)} previous responses")
+            self.state = StateStore(self.state_file)
+            self.state.import_json_history(self.history_file, self.email_history_file)
+            self.email_cache = EmailCache(
+                self.state,
+                max_bytes=self.settings.get('email_cache_max_mb', 20) * 1024 * 1024,
+                max_age_days=self.settings.get('email_cache_max_age_days', 14)
+            )
+            self.selectors = SelectorRegistry(self.state)
+            self.near_duplicates = NearDuplicateIndex(
+                self.state,
+                threshold=self.settings.get('near_duplicate_threshold', 0.7),
+                window_days=self.settings.get('near_duplicate_window_days', 14)
+            )
+            logging.info(f"Loaded {self.state.count_responses()} previous responses")
         except Exception as e:
             logging.error(f"Error loading response history: {str(e)}")
+            raise
 
     def save_response_history(self):
-        """Save responded posts to history file"""
+        """Commit any batched response history writes"""
         try:
-            with open(self.history_file, 'w') as f:
-                json.dump({
-                    'responded_posts': list(self.responded_posts),
-                    'last_updated': datetime.now().isoformat()
-                }, f)
+            self.state.commit()
             logging.info("Response history saved successfully")
         except Exception as e:
             logging.error(f"Error saving response history: {str(e)}")
@@ -94,13 +2035,17 @@ class LinkedInPostAutomation:
         """Initialize the Chrome WebDriver"""
         logging.info("Setting up Chrome WebDriver...")
         try:
-            chrome_options = Options()
-            chrome_options.add_argument("--no-sandbox")
-            chrome_options.add_argument("--disable-dev-shm-usage")
-            chrome_options.add_argument("--start-maximized")
-            chrome_options.add_argument("--disable-notifications")
-            
-            self.driver = webdriver.Chrome(options=chrome_options)
+            lean = self.settings.get('lean_browser', False)
+            self.driver = create_chrome_driver(lean, self.settings.get('browser_profile_dir'))
+            if lean:
+                logging.info("Using lean browser: headless, images, media and fonts blocked")
+            self.waits = WaitStrategy(self.driver, timeout=self.settings.get('wait_timeout', 10))
+            self.artifacts = ArtifactStore(
+                self.settings.get('artifact_dir', 'debug_artifacts'),
+                max_files=self.settings.get('artifact_max_files', 50),
+                max_bytes=self.settings.get('artifact_max_mb', 50) * 1024 * 1024,
+                sample_rate=self.settings.get('artifact_sample_rate', 0.05)
+            )
             logging.info("Chrome WebDriver setup successful!")
         except Exception as e:
             logging.error(f"Error setting up Chrome WebDriver: {str(e)}")
@@ -134,7 +2079,7 @@ class LinkedInPostAutomation:
             password_field.send_keys(Keys.RETURN)
             
             # Wait for login to complete
-            time.sleep(3)
+            self.waits.until('login', lambda driver: "/login" not in driver.current_url)
             
             # Verify login success
             if "feed" in self.driver.current_url or "mynetwork" in self.driver.current_url:
@@ -145,205 +2090,243 @@ class LinkedInPostAutomation:
             logging.error(f"Login failed: {str(e)}")
             raise
 
+    def start_session(self, email, password):
+        """Reuse the saved LinkedIn session if it is still valid, otherwise log in through the form"""
+        start = time.perf_counter()
+        if self.settings.get('browser_profile_dir'):
+            source = f"browser profile {self.settings.get('browser_profile_dir')}"
+            valid = self.session_is_valid()
+        else:
+            restored = self.restore_cookies()
+            source = f"{restored} saved cookies"
+            valid = restored > 0 and self.session_is_valid()
+        
+        if valid:
+            self.logged_in = True
+            logging.info(f"Session path: reused {source} ({time.perf_counter() - start:.1f}s)")
+            return 'reused'
+        
+        logging.info(f"Saved session not valid ({source}), logging in with the form")
+        if self.login_to_linkedin(email, password):
+            self.logged_in = True
+            self.save_cookies()
+        logging.info(f"Session path: form login ({time.perf_counter() - start:.1f}s)")
+        return 'login'
+
+    def session_is_valid(self):
+        """Open the feed and check LinkedIn doesn't redirect to a login, authwall or checkpoint page"""
+        self.driver.get("https://www.linkedin.com/feed/")
+        url = self.waits.until(
+            'session_check',
+            lambda driver: any(marker in driver.current_url for marker in SESSION_URL_MARKERS) and driver.current_url
+        )
+        return bool(url) and urlparse(url).path.startswith('/feed')
+
+    def restore_cookies(self):
+        """Load unexpired cookies from the cookie jar into the browser, returning how many were added"""
+        cookie_file = self.settings.get('cookie_file', 'linkedin_cookies.json')
+        if not os.path.exists(cookie_file):
+            return 0
+        try:
+            with open(cookie_file, 'r') as f:
+                cookies = json.load(f)
+        except (OSError, ValueError) as e:
+            logging.warning(f"Could not read {cookie_file}: {str(e)}")
+            return 0
+        
+        # Cookies can only be set for the domain of the current page
+        self.driver.get("https://www.linkedin.com/robots.txt")
+        restored = 0
+        for cookie in cookies:
+            if cookie.get('expiry') and cookie['expiry'] < time.time():
+                continue
+            try:
+                self.driver.add_cookie(cookie)
+                restored += 1
+            except Exception as e:
+                logging.debug(f"Skipped cookie {cookie.get('name')}: {str(e)}")
+        return restored
+
+    def save_cookies(self):
+        """Write the browser's LinkedIn cookies to the cookie jar, readable only by the current user"""
+        if self.settings.get('browser_profile_dir'):
+            return
+        cookie_file = self.settings.get('cookie_file', 'linkedin_cookies.json')
+        try:
+            cookies = self.driver.get_cookies()
+            fd = os.open(cookie_file, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+            with os.fdopen(fd, 'w') as f:
+                json.dump(cookies, f)
+            logging.info(f"Saved {len(cookies)} cookies to {cookie_file}")
+        except Exception as e:
+            logging.warning(f"Could not save cookies: {str(e)}")
+
+    def extract_post_records(self):
+        """Extract posts added since the last call as plain records using a single script call"""
+        start = time.perf_counter()
+        # POST_SELECTORS stays in its static, most-specific-first order: the broader fallbacks also
+        # match on a healthy page, so promoting one would pick up non-post containers
+        raw = self.driver.execute_script(POST_EXTRACTION_SCRIPT, POST_SELECTORS, POST_FIELD_SELECTORS)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        
+        result = json.loads(raw) if raw else {}
+        records = result.get('records', [])
+        for record in records:
+            record['age_seconds'] = parse_post_age(record.get('age'))
+        self.last_page_total = result.get('total', 0)
+        logging.info(f"Extracted {len(records)} new of {result.get('total')} posts in {elapsed_ms:.0f} ms "
+                     f"with selector: {result.get('selector')} (watermark {result.get('watermark')})",
+                     extra={'stage': 'extract', 'duration_ms': round(elapsed_ms, 2)})
+        return records
+
+    def remember_post(self, post_id):
+        """Record a post as seen across all search terms, returning False if it was already seen"""
+        if post_id in self.seen_posts:
+            self.seen_posts.move_to_end(post_id)
+            return False
+        self.seen_posts[post_id] = True
+        while len(self.seen_posts) > self.settings.get('seen_posts_limit', 5000):
+            self.seen_posts.popitem(last=False)
+        return True
+
+    def seed_seen_posts(self):
+        """Tell the extraction script which posts earlier searches already returned so it skips them"""
+        if self.seen_posts:
+            self.driver.execute_script(SEED_SEEN_POSTS_SCRIPT, list(self.seen_posts))
+
+    def evaluate_post(self, post):
+        """Run a post record through the email, candidate, location and contract filters"""
+        decision = {
+            'post_id': self.get_post_identifier(post),
+            'author': post.get('author', '').strip() or "LinkedIn User",
+            'content': post.get('content', '').strip(),
+            'job_description': post.get('job_description', '').strip(),
+            'emails': [],
+            'is_us_job': False,
+            'is_contract': False,
+            'matches': {},
+            'qualified': False,
+            'reason': None,
+            'message': None
+        }
+        content = decision['content']
+        job_description = decision['job_description']
+        
+        if not content:
+            logging.debug("Empty content in post")
+            decision['reason'] = 'empty_content'
+            return decision
+        
+        # Extract emails
+        emails = self.extract_emails(content + " " + job_description)
+        if not emails:
+            logging.debug("No emails found in post")
+            decision['reason'] = 'no_emails'
+            return decision
+        decision['emails'] = emails
+        
+        # Classify the text in a single pass over every keyword category
+        combined_text = (content + " " + job_description).lower()
+        matches = POST_CLASSIFIER.classify(combined_text)
+        decision['matches'] = {category: [term for term, _ in found] for category, found in matches.items()}
+        
+        # Check if this is a candidate post (not a job posting)
+        if 'candidate' in matches:
+            indicator = matches['candidate'][0][0]
+            logging.debug(f"Skipping candidate post (detected term: {indicator})")
+            decision['reason'] = 'candidate_post'
+            decision['message'] = f"Skipping candidate post (detected term: {indicator})"
+            return decision
+        
+        # Check if job is in the US, skipping anything that names a non-US location
+        if 'non_us' in matches:
+            term = matches['non_us'][0][0]
+            logging.debug(f"Skipping non-US job based on term: {term}")
+            decision['reason'] = 'non_us'
+            decision['message'] = f"Skipping non-US job (detected term: {term})"
+            return decision
+        
+        is_us_job = False
+        if 'us' in matches:
+            is_us_job = True
+            logging.debug(f"Detected US job based on term: {matches['us'][0][0]}")
+            
+        # Also check for US zip code pattern
+        if ZIP_CODE_PATTERN.search(combined_text):
+            is_us_job = True
+            logging.debug("Detected US job based on zip code pattern")
+        decision['is_us_job'] = is_us_job
+        
+        # Check if this is a contract/C2C position, unless it explicitly states no contract
+        if 'non_contract' in matches:
+            term = matches['non_contract'][0][0]
+            logging.debug(f"Skipping non-contract position (detected term: {term})")
+            decision['reason'] = 'non_contract'
+            decision['message'] = f"Skipping non-contract position (detected term: {term})"
+            return decision
+        
+        is_contract_position = False
+        if 'contract' in matches:
+            is_contract_position = True
+            logging.debug(f"Detected contract position based on term: {matches['contract'][0][0]}")
+        
+        if not is_contract_position:
+            logging.debug("Contract status not explicitly mentioned, assuming potential contract opportunity")
+            decision['message'] = "Contract status not explicitly mentioned, assuming potential contract opportunity"
+            is_contract_position = True
+        decision['is_contract'] = is_contract_position
+        
+        decision['qualified'] = True
+        return decision
+
     def process_post(self, post):
-        """Process a single post"""
+        """Process a single post record"""
         try:
-            # Extract post content
-            content_elements = post.find_elements(By.CSS_SELECTOR, ".feed-shared-update-v2__description-wrapper, .feed-shared-text, .update-components-text, .feed-shared-update-v2__commentary, .update-components-text span[dir='ltr'], .feed-shared-text__text-view, .feed-shared-update-v2__update-content-wrapper")
-            
-            if not content_elements:
-                logging.debug("No content found in post")
-                return False
-            
-            content = ""
-            for element in content_elements:
-                try:
-                    content += element.text + " "
-                except:
-                    pass
-            
-            content = content.strip()
-            if not content:
-                logging.debug("Empty content in post")
-                return False
-            
-            # Get post author
-            author_elements = post.find_elements(By.CSS_SELECTOR, ".feed-shared-actor__name, .update-components-actor__name, .feed-shared-actor__title, .update-components-actor__meta a, .feed-shared-actor__meta a, .update-components-actor__meta-link")
-            author = ""
-            for element in author_elements:
-                try:
-                    author += element.text + " "
-                except:
-                    pass
-            
-            author = author.strip()
-            if not author:
-                author = "LinkedIn User"
-            
-            # Extract job description
-            job_description = ""
-            job_desc_elements = post.find_elements(By.CSS_SELECTOR, ".feed-shared-update-v2__description, .feed-shared-text__text-view, .update-components-text, .feed-shared-inline-show-more-text")
-            for element in job_desc_elements:
-                try:
-                    if element.text and element.text not in content:
-                        job_description += element.text + " "
-                except:
-                    pass
-            
-            job_description = job_description.strip()
-            
             # Get post identifier to avoid duplicates
             post_id = self.get_post_identifier(post)
-            if post_id in self.responded_posts:
-                logging.info(f"Already responded to post: {post_id}")
+            if self.state.has_responded(post_id):
+                logging.debug(f"Already responded to post: {post_id}")
+                self.metrics.increment('posts_filtered', reason='already_responded')
                 return False
             
-            # Extract emails
-            emails = self.extract_emails(content + " " + job_description)
-            if not emails:
-                logging.debug("No emails found in post")
+            start = time.perf_counter()
+            decision = self.evaluate_post(post)
+            elapsed = time.perf_counter() - start
+            self.metrics.observe('evaluate', elapsed)
+            logging.info(f"Post {post_id}: {decision['reason'] or 'qualified'}", extra={
+                'post_id': post_id, 'stage': 'evaluate', 'decision': decision['reason'] or 'qualified',
+                'duration_ms': round(elapsed * 1000, 2)
+            })
+            if decision['message']:
+                print(f"\n{decision['message']}")
+            if not decision['qualified']:
+                self.metrics.increment('posts_filtered', reason=decision['reason'])
                 return False
             
-            # Check if this is a candidate post (not a job posting)
-            combined_text = (content + " " + job_description).lower()
-            candidate_indicators = [
-                'open to work',
-                'seeking opportunities',
-                'job seeker',
-                'seeking a role',
-                'seeking a position'
-            ]
-            
-            for indicator in candidate_indicators:
-                if indicator in combined_text:
-                    logging.info(f"Skipping candidate post (detected term: {indicator})")
-                    print(f"\nSkipping candidate post (detected term: {indicator})")
-                    return False
-            
-            # Check if job is in the US
-            is_us_job = False
-            us_terms = ['united states', ' usa', 'u.s.', 'u.s.a', 'america', 'american', 'remote us', 'us remote', 
-                       'california', 'new york', 'texas', 'florida', 'illinois', 'pennsylvania', 'ohio', 'georgia', 
-                       'north carolina', 'michigan', 'new jersey', 'virginia', 'washington', 'arizona', 'massachusetts', 
-                       'tennessee', 'indiana', 'missouri', 'maryland', 'wisconsin', 'minnesota', 'colorado', 'alabama', 
-                       'south carolina', 'louisiana', 'kentucky', 'oregon', 'oklahoma', 'connecticut', 'utah', 'iowa', 
-                       'nevada', 'arkansas', 'mississippi', 'kansas', 'new mexico', 'nebraska', 'west virginia', 
-                       'idaho', 'hawaii', 'new hampshire', 'maine', 'montana', 'rhode island', 'delaware', 
-                       'south dakota', 'north dakota', 'alaska', 'vermont', 'wyoming', 'dc', 'washington dc',
-                       'chicago', 'new york city', 'nyc', 'los angeles', 'la', 'san francisco', 'sf', 'seattle', 
-                       'boston', 'austin', 'dallas', 'houston', 'atlanta', 'miami', 'philadelphia', 'phoenix', 
-                       'denver', 'san diego', 'san jose', 'nashville', 'portland', 'charlotte', 'raleigh']
-            
-            # Non-US locations to explicitly exclude
-            non_us_terms = ['india', 'hyderabad', 'bangalore', 'mumbai', 'delhi', 'chennai', 'kolkata', 'pune', 
-                           'ahmedabad', 'jaipur', 'surat', 'kanpur', 'nagpur', 'lucknow', 'indore', 'bhopal',
-                           'united kingdom', 'uk', 'london', 'manchester', 'birmingham', 'liverpool', 'glasgow',
-                           'canada', 'toronto', 'montreal', 'vancouver', 'ottawa', 'calgary', 'edmonton',
-                           'australia', 'sydney', 'melbourne', 'brisbane', 'perth', 'adelaide',
-                           'germany', 'berlin', 'munich', 'hamburg', 'frankfurt', 'cologne',
-                           'france', 'paris', 'lyon', 'marseille', 'toulouse', 'nice',
-                           'spain', 'madrid', 'barcelona', 'valencia', 'seville',
-                           'italy', 'rome', 'milan', 'naples', 'turin', 'palermo',
-                           'japan', 'tokyo', 'osaka', 'kyoto', 'yokohama', 'nagoya',
-                           'china', 'beijing', 'shanghai', 'guangzhou', 'shenzhen',
-                           'brazil', 'sao paulo', 'rio de janeiro', 'brasilia',
-                           'mexico', 'mexico city', 'guadalajara', 'monterrey',
-                           'singapore', 'hong kong', 'dubai', 'abu dhabi', 'doha', 'qatar',
-                           'ireland', 'dublin', 'cork', 'galway',
-                           'netherlands', 'amsterdam', 'rotterdam', 'the hague',
-                           'sweden', 'stockholm', 'gothenburg', 'malmo',
-                           'switzerland', 'zurich', 'geneva', 'bern',
-                           'poland', 'warsaw', 'krakow', 'lodz',
-                           'south africa', 'johannesburg', 'cape town', 'durban',
-                           'new zealand', 'auckland', 'wellington', 'christchurch',
-                           'argentina', 'buenos aires', 'cordoba', 'rosario',
-                           'chile', 'santiago', 'valparaiso', 'concepcion',
-                           'colombia', 'bogota', 'medellin', 'cali',
-                           'israel', 'tel aviv', 'jerusalem', 'haifa',
-                           'philippines', 'manila', 'quezon city', 'davao',
-                           'vietnam', 'ho chi minh city', 'hanoi', 'da nang',
-                           'thailand', 'bangkok', 'chiang mai', 'phuket',
-                           'malaysia', 'kuala lumpur', 'penang', 'johor bahru',
-                           'indonesia', 'jakarta', 'surabaya', 'bandung',
-                           'pakistan', 'karachi', 'lahore', 'islamabad',
-                           'bangladesh', 'dhaka', 'chittagong', 'khulna',
-                           'sri lanka', 'colombo', 'kandy', 'galle',
-                           'nepal', 'kathmandu', 'pokhara', 'lalitpur',
-                           'remote global', 'worldwide remote', 'global remote', 'international remote']
-            
-            combined_text = (content + " " + job_description).lower()
-            
-            # First check if it contains any non-US terms
-            for term in non_us_terms:
-                if term.lower() in combined_text:
-                    logging.info(f"Skipping non-US job based on term: {term}")
-                    print(f"\nSkipping non-US job (detected term: {term})")
-                    return False
-            
-            # Only check for US terms if no non-US terms were found
-            for term in us_terms:
-                if term.lower() in combined_text:
-                    is_us_job = True
-                    logging.info(f"Detected US job based on term: {term}")
-                    break
-                
-            # Also check for US zip code pattern
-            if re.search(r'\b\d{5}(?:-\d{4})?\b', combined_text):
-                is_us_job = True
-                logging.info("Detected US job based on zip code pattern")
-            
-            # Check if this is a contract/C2C position
-            contract_terms = ['contract', 'c2c', 'corp-to-corp', 'corp to corp', 'corporation to corporation', 
-                             'contractor', 'consulting', 'consultant', '1099', 'independent contractor', 'f2f']
-            
-            non_contract_terms = ['w2 only', 'no c2c', 'no corp-to-corp', 'no 1099', 'permanent only', 'full time only', 'no contractors']
-            
-            # First check if it explicitly states no contract
-            for term in non_contract_terms:
-                if term.lower() in combined_text:
-                    logging.info(f"Skipping non-contract position (detected term: {term})")
-                    print(f"\nSkipping non-contract position (detected term: {term})")
-                    return False
-            
-            # Then check if it mentions contract terms
-            is_contract_position = False
-            for term in contract_terms:
-                if term.lower() in combined_text:
-                    is_contract_position = True
-                    logging.info(f"Detected contract position based on term: {term}")
-                    break
+            # Skip reposts of a requirement that was already handled, before any generation cost
+            signature = NearDuplicateIndex.signature(decision['content'] + " " + decision['job_description'])
+            duplicate_of = self.near_duplicates.find(signature, self.pipeline and self.pipeline.pending_signatures())
+            if duplicate_of:
+                logging.info(f"Skipping near-duplicate of post {duplicate_of}")
+                print("\nSkipping - near-duplicate of a post already handled")
+                self.metrics.increment('posts_filtered', reason='near_duplicate')
+                return False
             
-            if not is_contract_position:
-                logging.info("Contract status not explicitly mentioned, assuming potential contract opportunity")
-                print("\nContract status not explicitly mentioned, assuming potential contract opportunity")
-                is_contract_position = True
+            emails = decision['emails']
+            is_us_job = decision['is_us_job']
             
             # Check if we've already emailed this person today
             email_domain = emails[0].split('@')[1]
             today = datetime.now().strftime('%Y-%m-%d')
             
-            # Load email history
-            email_history = {}
-            try:
-                if os.path.exists('email_history.json'):
-                    with open('email_history.json', 'r') as f:
-                        email_history = json.load(f)
-            except Exception as e:
-                logging.warning(f"Could not load email history: {str(e)}")
-            
             # Check if we've emailed this domain today
-            if email_domain in email_history and email_history[email_domain].get('date') == today:
+            if self.state.has_emailed_domain(email_domain, today):
                 logging.info(f"Already emailed domain {email_domain} today")
                 print(f"\nSkipping - already emailed domain {email_domain} today")
+                self.metrics.increment('posts_filtered', reason='domain_emailed_today')
                 return False
             
-            # Load config to check auto-send setting
-            try:
-                with open('config.json', 'r') as f:
-                    config = json.load(f)
-                auto_send_us_jobs = config.get('auto_send_us_jobs', True)
-            except:
-                auto_send_us_jobs = True
+            auto_send_us_jobs = self.settings.get('auto_send_us_jobs', True)
             
             if is_us_job:
                 print("\nDetected US job opening - automatically responding")
@@ -355,757 +2338,333 @@ class LinkedInPostAutomation:
             
             # Prepare post data
             post_data = {
-                'author': author,
-                'content': content,
-                'job_description': job_description,
+                'author': decision['author'],
+                'content': decision['content'],
+                'job_description': decision['job_description'],
                 'emails': emails,
                 'is_us_job': is_us_job,
-                'is_contract': is_contract_position
+                'is_contract': decision['is_contract']
             }
             
-            # Draft and send email
-            result = self.draft_and_send_email(post_data, self.email, self.password)
-            
-            if result:
-                # Add to responded posts
-                self.responded_posts.add(post_id)
-                self.save_response_history()
-                
-                # Update email history
-                email_history[email_domain] = {
-                    'date': today,
-                    'email': emails[0],
-                    'post_id': post_id
-                }
-                
-                # Save email history
-                try:
-                    with open('email_history.json', 'w') as f:
-                        json.dump(email_history, f)
-                except Exception as e:
-                    logging.warning(f"Could not save email history: {str(e)}")
-                
-                return True
+            # Rate the post against the resume; poor matches never reach generation and the rest are answered best first
+            text = decision['content'] + " " + decision['job_description']
+            with self.metrics.timer('fit_score'):
+                score = self.skills.score(text, self.settings.resume())
+            if score is not None and score < self.settings.get('fit_min_score', 0.3):
+                logging.info(f"Post {post_id}: low fit ({score:.2f})", extra={
+                    'post_id': post_id, 'stage': 'score', 'decision': 'low_fit'
+                })
+                print(f"\nSkipping - low fit with resume ({score:.2f})")
+                self.metrics.increment('posts_filtered', reason='low_fit')
+                return False
             
-            return False
+            self.metrics.increment('posts', event='qualified')
+            
+            # Queue the post; the best-fitting posts are answered when the cycle's results are drained
+            self.fit_queue.push(score or 0.0, {
+                'post_id': post_id,
+                'email_domain': email_domain,
+                'date': today,
+                'queued_at': time.time(),
+                'score': score,
+                'signature': signature,
+                'post_data': post_data
+            }, self.settings.get('fit_queue_size', 200))
+            logging.info(f"Post {post_id}: queued with fit {'n/a' if score is None else f'{score:.2f}'}", extra={
+                'post_id': post_id, 'stage': 'score', 'decision': 'queued'
+            })
+            return True
             
         except Exception as e:
             logging.error(f"Error processing post: {str(e)}")
             return False
 
     def get_post_identifier(self, post):
-        """Generate a unique identifier for a post to avoid duplicates"""
+        """Generate a unique identifier for a post record to avoid duplicates"""
         try:
-            # Try to get post ID from data-id attribute
-            post_id = post.get_attribute('data-id')
-            if post_id:
-                return post_id
-            
-            # Try to get post URL
-            post_links = post.find_elements(By.CSS_SELECTOR, "a.app-aware-link")
-            for link in post_links:
-                href = link.get_attribute('href')
-                if href and '/posts/' in href:
-                    return href
-            
-            # If no ID or URL, use author name + first 50 chars of content
-            author_elements = post.find_elements(By.CSS_SELECTOR, ".feed-shared-actor__name, .update-components-actor__name")
-            author = ""
-            for element in author_elements:
-                try:
-                    author += element.text + " "
-                except:
-                    pass
-            
-            content_elements = post.find_elements(By.CSS_SELECTOR, ".feed-shared-update-v2__description-wrapper, .feed-shared-text")
-            content = ""
-            for element in content_elements:
-                try:
-                    content += element.text + " "
-                except:
-                    pass
-            
-            # Create a hash of author + content
+            # Prefer the post's data-id attribute, then its activity URN
+            if post.get('data_id'):
+                return post['data_id']
+            if post.get('urn'):
+                return post['urn']
+            
+            # Then the post URL
+            if post.get('permalink'):
+                return post['permalink']
+            
+            # If no ID or URL, hash the author name + first 100 chars of content
+            author = post.get('id_author', '')
+            content = post.get('id_content', '')
             identifier = hashlib.md5((author + content[:100]).encode()).hexdigest()
             return identifier
         except Exception as e:
             logging.error(f"Error generating post identifier: {str(e)}")
             # Fallback to a random ID
-            import random
             return f"post_{random.randint(1000, 9999)}"
 
     def extract_emails(self, text):
-        """Extract all emails from text using regex"""
-        if not text:
-            return []
+        """Extract all emails from text"""
+        return extract_emails(text)
+
+    def save_page_source(self, filename_prefix="page_source"):
+        """Keep the current page source and a screenshot as failure artifacts for debugging"""
+        self.artifacts.capture(self.driver, filename_prefix, kind='screenshot', failure=True)
+        return self.artifacts.capture(self.driver, filename_prefix, failure=True)
+
+    def open_search_results(self, search_term):
+        """Open recent past-24h post results for a search term, preferring the direct URL over clicking through filters"""
+        mode = self.settings.get('navigation_mode', 'url')
+        self.sorted_by_date = False
+        if mode == 'url':
+            start = time.perf_counter()
+            if self.navigate_by_url(search_term):
+                logging.info(f"Time to first post via search URL: {time.perf_counter() - start:.1f}s")
+                return 'url'
+            logging.warning("Search URL did not show filtered post results, falling back to clicking through filters")
         
-        # Clean the text first
-        # Replace common HTML entities
-        text = text.replace('&nbsp;', ' ')
-        text = text.replace('&amp;', '&')
-        text = text.replace('&lt;', '<')
-        text = text.replace('&gt;', '>')
+        start = time.perf_counter()
+        self.navigate_by_clicks(search_term)
+        found = self.waits.post_count_above('first_post', 0, self.settings.get('wait_timeout', 10))
+        logging.info(f"Time to first post via filter clicks: {time.perf_counter() - start:.1f}s"
+                     f"{'' if found else ' (no posts appeared)'}")
+        return 'clicks'
+
+    def navigate_by_url(self, search_term):
+        """Load the content search with the Recent sort and Past 24 hours filter already applied"""
+        self.driver.get(SEARCH_RESULTS_URL + urlencode(
+            {'keywords': search_term, 'origin': 'FACETED_SEARCH', 'sortBy': '"date_posted"', 'datePosted': '"past-24h"'},
+            quote_via=quote
+        ))
+        url = self.driver.current_url
+        if "/search/results/content" not in url or "datePosted" not in url:
+            logging.info(f"Search URL was redirected to {url}")
+            return False
+        if not self.waits.post_count_above('first_post', 0, self.settings.get('wait_timeout', 10)):
+            return False
+        self.sorted_by_date = "date_posted" in url
+        if not self.sorted_by_date:
+            logging.info(f"Search URL lost the Recent sort: {url}")
+        return True
+
+    def navigate_by_clicks(self, search_term):
+        """Reach the filtered results from the feed by typing the search and clicking Posts, Recent and Past 24 hours"""
+        self.sorted_by_date = False
+        # Navigate to LinkedIn search page
+        self.driver.get("https://www.linkedin.com/feed/")
         
-        # Common email patterns
-        patterns = [
-            r'[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}',  # Standard email
-            r'[a-zA-Z0-9._%+-]+\s*@\s*[a-zA-Z0-9.-]+\s*\.\s*[a-zA-Z]{2,}',  # Email with spaces
-            r'[a-zA-Z0-9._%+-]+\s*\[at\]\s*[a-zA-Z0-9.-]+\s*\[dot\]\s*[a-zA-Z]{2,}',  # [at] and [dot]
-            r'[a-zA-Z0-9._%+-]+\s*\[at\]\s*[a-zA-Z0-9.-]+\s*\(dot\)\s*[a-zA-Z]{2,}',  # [at] and (dot)
-            r'[a-zA-Z0-9._%+-]+\s*\[at\]\s*[a-zA-Z0-9.-]+\s*\[\.\]\s*[a-zA-Z]{2,}',  # [at] and [.]
-            r'[a-zA-Z0-9._%+-]+\s*@\s*[a-zA-Z0-9.-]+\s*dot\s*[a-zA-Z]{2,}',  # @ and dot
-            r'[a-zA-Z0-9._%+-]+\s*\[\.\]\s*[a-zA-Z0-9.-]+\s*\[\.\]\s*[a-zA-Z]{2,}',  # [.] for @ and dot
-            r'email:?\s*[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}',  # email: prefix
-            r'e-?mail:?\s*[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}',  # e-mail: prefix
-            r'contact:?\s*[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}',  # contact: prefix
-            r'send\s+(?:your\s+)?(?:resume|cv)(?:\s+to)?:?\s*[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}',  # send resume to: prefix
-            r'apply(?:\s+to)?:?\s*[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}'  # apply to: prefix
-        ]
+        # Find and click on the search box
+        search_box = WebDriverWait(self.driver, 10).until(
+            EC.element_to_be_clickable((By.XPATH, "//input[contains(@class, 'search-global-typeahead__input')]"))
+        )
+        search_box.click()
+        search_box.send_keys(search_term)
+        search_box.send_keys(Keys.RETURN)
+        self.waits.until('search_results', EC.url_contains("/search/results/"))
+        self.waits.settled('search_results')
         
-        emails = []
-        text = text.replace('\n', ' ')  # Replace newlines with spaces
+        # Click on the Posts tab, falling back to the filter dropdown
+        posts_tab_clicked = self.click_target('posts_tab')
+        if not posts_tab_clicked and self.click_target('filter_dropdown', expect='dropdown'):
+            posts_tab_clicked = self.click_target('posts_option')
         
-        # First, try to find emails with context
-        context_patterns = [
-            r'email\s*(?:address|id)?[\s:]*([a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,})',
-            r'e-?mail\s*(?:address|id)?[\s:]*([a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,})',
-            r'send\s+(?:your\s+)?(?:resume|cv)(?:\s+to)?[\s:]*([a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,})',
-            r'apply(?:\s+to)?[\s:]*([a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,})',
-            r'contact[\s:]*([a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,})',
-            r'reach\s+(?:out|me)(?:\s+at)?[\s:]*([a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,})',
-            r'(?:my|our)\s+email[\s:]*([a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,})'
-        ]
+        self.artifacts.capture(self.driver, 'after_search_before_posts_tab', kind='screenshot')
         
-        for pattern in context_patterns:
-            matches = re.findall(pattern, text, re.IGNORECASE)
-            for match in matches:
-                if match and '@' in match:
-                    emails.append(match.strip())
+        if not posts_tab_clicked:
+            logging.warning("Could not click on Posts tab using any method. Taking a screenshot and saving page source for debugging.")
+            self.save_page_source("failed_posts_tab_click")
         
-        # Then try the regular patterns
-        for pattern in patterns:
-            found = re.findall(pattern, text, re.IGNORECASE)
-            if found:
-                # Clean up the found emails
-                for email in found:
-                    # Extract just the email if there's a prefix like "email:"
-                    if ':' in email:
-                        parts = email.split(':', 1)
-                        if len(parts) > 1 and '@' in parts[1]:
-                            email = parts[1].strip()
-                    
-                    # Replace common obfuscations
-                    email = re.sub(r'\s*\[at\]\s*', '@', email, flags=re.IGNORECASE)
-                    email = re.sub(r'\s*\(at\)\s*', '@', email, flags=re.IGNORECASE)
-                    email = re.sub(r'\s+at\s+', '@', email, flags=re.IGNORECASE)
-                    email = re.sub(r'\s+AT\s+', '@', email, flags=re.IGNORECASE)
-                    
-                    email = re.sub(r'\s*\[dot\]\s*', '.', email, flags=re.IGNORECASE)
-                    email = re.sub(r'\s*\(dot\)\s*', '.', email, flags=re.IGNORECASE)
-                    email = re.sub(r'\s+dot\s+', '.', email, flags=re.IGNORECASE)
-                    email = re.sub(r'\s+DOT\s+', '.', email, flags=re.IGNORECASE)
-                    email = re.sub(r'\s*\[\.\]\s*', '.', email, flags=re.IGNORECASE)
-                    
-                    # Remove spaces
-                    email = ''.join(email.split())
-                    
-                    # Validate the email has proper format after cleaning
-                    if re.match(r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$', email):
-                        emails.append(email)
+        # Verify we're on the Posts results page and take a screenshot
+        try:
+            # Wait for posts to load
+            WebDriverWait(self.driver, 10).until(
+                EC.presence_of_element_located((By.CSS_SELECTOR, ".search-results__list, .reusable-search__result-container"))
+            )
+            logging.info("Posts results loaded successfully")
+            
+            # Occasionally keep the results page to compare against when selectors start failing
+            self.artifacts.capture(self.driver, 'after_posts_tab_click', kind='screenshot')
+            self.artifacts.capture(self.driver, 'after_posts_tab_click')
+        except:
+            logging.warning("Could not verify posts results loaded, continuing anyway")
         
-        # Remove duplicates while preserving order
-        unique_emails = []
-        for email in emails:
-            if email not in unique_emails:
-                unique_emails.append(email)
+        # Sort by recent posts, then filter for Past 24 hours
+        try:
+            if self.click_target('sort_dropdown', expect='dropdown'):
+                self.sorted_by_date = self.click_target('recent_option')
+        except Exception as e:
+            logging.warning(f"Failed to sort by recent posts: {str(e)}")
         
-        return unique_emails
-
-    def save_page_source(self, filename_prefix="page_source"):
-        """Save the current page source to a file for debugging"""
         try:
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            filename = f"{filename_prefix}_{timestamp}.html"
-            with open(filename, "w", encoding="utf-8") as f:
-                f.write(self.driver.page_source)
-            logging.info(f"Saved page source to {filename}")
-            return filename
+            if self.click_target('date_filter_dropdown', expect='dropdown'):
+                self.click_target('past_24h_option')
         except Exception as e:
-            logging.error(f"Error saving page source: {str(e)}")
-            return None
+            logging.warning(f"Failed to filter for Past 24 hours: {str(e)}")
+        
 
     def search_and_process_posts(self, search_term, max_posts=50):
-        """Search for posts and process them"""
-        try:
-            # Navigate to LinkedIn search page
-            self.driver.get("https://www.linkedin.com/feed/")
-            time.sleep(3)
-            
-            # Find and click on the search box
-            search_box = WebDriverWait(self.driver, 10).until(
-                EC.element_to_be_clickable((By.XPATH, "//input[contains(@class, 'search-global-typeahead__input')]"))
-            )
-            search_box.click()
-            search_box.send_keys(search_term)
-            search_box.send_keys(Keys.RETURN)
-            time.sleep(5)
-            
-            # Click on the Posts tab - try multiple approaches
-            posts_tab_clicked = False
-            
-            # First approach: Direct CSS selectors
-            posts_tab_selectors = [
-                "button.search-reusables__filter-pill-button[aria-label='Posts']",
-                "button[data-control-name='search_filter_posts']",
-                ".search-reusables__filter-trigger-and-dropdown[aria-label='Posts']",
-                ".artdeco-pill.artdeco-pill--slate.artdeco-pill--choice.artdeco-pill--2.search-reusables__filter-pill-button[aria-label='Posts']"
-            ]
-            
-            for selector in posts_tab_selectors:
-                try:
-                    posts_tabs = self.driver.find_elements(By.CSS_SELECTOR, selector)
-                    for tab in posts_tabs:
-                        if tab.is_displayed() and "posts" in tab.text.lower():
-                            self.driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", tab)
-                            time.sleep(1)
-                            self.driver.execute_script("arguments[0].click();", tab)
-                            posts_tab_clicked = True
-                            logging.info(f"Clicked Posts tab with selector: {selector}")
-                            time.sleep(5)
-                            break
-                    if posts_tab_clicked:
-                        break
-                except Exception as e:
-                    logging.debug(f"Failed to click Posts tab with selector {selector}: {str(e)}")
-            
-            # Second approach: Try XPath if CSS selectors didn't work
-            if not posts_tab_clicked:
-                posts_tab_xpaths = [
-                    "//button[contains(text(), 'Posts')]",
-                    "//button[contains(@aria-label, 'Posts')]",
-                    "//span[contains(text(), 'Posts')]/parent::button",
-                    "//div[contains(@class, 'search-reusables')]//*[contains(text(), 'Posts')]"
-                ]
+        """Run one search cycle: open the results, then scroll and process posts until they run out or age past the window"""
+        cycle_start = time.perf_counter()
+        with self.metrics.timer('navigate'):
+            self.open_search_results(search_term)
+        self.seed_seen_posts()
+        
+        posts_seen = 0
+        posts_processed = 0
+        max_scrolls = self.settings.get('max_scrolls', 100)
+        empty_scroll_limit = self.settings.get('empty_scroll_limit', 3)
+        age_window = self.settings.get('post_age_window_hours', 24) * 3600
+        scroll_count = 0
+        empty_scrolls = 0
+        oldest_age = None
+        stale_posts = 0
+        # One post past the window ends the search only when the Recent sort is known to be applied
+        stale_post_limit = 1 if self.sorted_by_date else self.settings.get('stale_post_limit', 3)
+        stop_reason = 'max_scrolls'
+        
+        while scroll_count < max_scrolls:
+            # Get all visible posts
+            try:
+                with self.metrics.timer('extract'):
+                    posts = self.extract_post_records()
                 
-                for xpath in posts_tab_xpaths:
-                    try:
-                        posts_elements = self.driver.find_elements(By.XPATH, xpath)
-                        for element in posts_elements:
-                            if element.is_displayed():
-                                self.driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", element)
-                                time.sleep(1)
-                                self.driver.execute_script("arguments[0].click();", element)
-                                posts_tab_clicked = True
-                                logging.info(f"Clicked Posts tab with XPath: {xpath}")
-                                time.sleep(5)
-                                break
-                        if posts_tab_clicked:
-                            break
-                    except Exception as e:
-                        logging.debug(f"Failed to click Posts tab with XPath {xpath}: {str(e)}")
-            
-            # Third approach: Try to find all tabs and click on the one that says "Posts"
-            if not posts_tab_clicked:
-                try:
-                    # Try to find all filter tabs
-                    all_tabs = self.driver.find_elements(By.CSS_SELECTOR, ".search-reusables__filter-pill-button, .artdeco-pill--choice, [data-control-name*='filter'], .search-reusables__primary-filter button")
+                if not posts:
+                    logging.warning("No new posts found. Trying to scroll...")
+                else:
+                    logging.info(f"Processing {len(posts)} posts")
                     
-                    for tab in all_tabs:
-                        try:
-                            if tab.is_displayed() and ("posts" in tab.text.lower() or (tab.get_attribute("aria-label") and "posts" in tab.get_attribute("aria-label").lower())):
-                                self.driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", tab)
-                                time.sleep(1)
-                                self.driver.execute_script("arguments[0].click();", tab)
-                                posts_tab_clicked = True
-                                logging.info("Clicked Posts tab from general tab collection")
-                                time.sleep(5)
-                                break
-                        except Exception as e:
+                    # Process each post
+                    for post in posts:
+                        age = post.get('age_seconds')
+                        if age is not None:
+                            oldest_age = age if oldest_age is None else max(oldest_age, age)
+                            if age > age_window:
+                                stale_posts += 1
+                                self.metrics.increment('posts', event='stale')
+                                continue
+                            stale_posts = 0
+                        post_id = self.get_post_identifier(post)
+                        if not post_id:
                             continue
-                except Exception as e:
-                    logging.debug(f"Failed to find Posts tab in general tab collection: {str(e)}")
-            
-            # Fourth approach: Try clicking on the filter dropdown and selecting Posts
-            if not posts_tab_clicked:
-                try:
-                    # Try to find and click on the filter dropdown
-                    filter_dropdown_selectors = [
-                        "button.search-reusables__filter-trigger-and-dropdown",
-                        "button[aria-label='Sort by']",
-                        "button.artdeco-dropdown__trigger--is-dropdown-trigger",
-                        "button.search-reusables__sort-dropdown-trigger",
-                        "button.search-reusables__sort-filter",
-                        ".search-reusables__primary-filter button[data-control-name='sort_dropdown']"
-                    ]
-                    
-                    dropdown_clicked = False
-                    for selector in filter_dropdown_selectors:
-                        try:
-                            dropdowns = self.driver.find_elements(By.CSS_SELECTOR, selector)
-                            for dropdown in dropdowns:
-                                if dropdown.is_displayed() and ("sort" in dropdown.text.lower() or "sort" in dropdown.get_attribute("aria-label").lower() if dropdown.get_attribute("aria-label") else False):
-                                    self.driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", dropdown)
-                                    time.sleep(1)
-                                    self.driver.execute_script("arguments[0].click();", dropdown)
-                                    dropdown_clicked = True
-                                    logging.info(f"Clicked filter dropdown with selector: {selector}")
-                                    time.sleep(2)
-                                    break
-                            if dropdown_clicked:
-                                break
-                        except Exception as e:
-                            logging.debug(f"Failed to click filter dropdown with selector {selector}: {str(e)}")
+                        if not self.remember_post(post_id):
+                            self.metrics.increment('posts', event='deduped')
+                            continue
+                        posts_seen += 1
+                        self.metrics.increment('posts', event='seen')
+                        if self.process_post(post):
+                            print("\nQueued post for a response!")
+                            posts_processed += 1
                     
-                    # If dropdown clicked, try to find and click Posts option
-                    if dropdown_clicked:
-                        posts_option_selectors = [
-                            ".artdeco-dropdown__content li button:contains('Posts')",
-                            ".search-reusables__dropdown-list li button:contains('Posts')",
-                            ".artdeco-dropdown__item:contains('Posts')"
-                        ]
-                        
-                        for selector in posts_option_selectors:
-                            try:
-                                options = self.driver.find_elements(By.CSS_SELECTOR, selector)
-                                for option in options:
-                                    if option.is_displayed() and "posts" in option.text.lower():
-                                        self.driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", option)
-                                        time.sleep(1)
-                                        self.driver.execute_script("arguments[0].click();", option)
-                                        posts_tab_clicked = True
-                                        logging.info(f"Selected Posts option from dropdown with selector: {selector}")
-                                        time.sleep(3)
-                                        break
-                                if posts_tab_clicked:
-                                    break
-                            except Exception as e:
-                                logging.debug(f"Failed to click Posts option with selector {selector}: {str(e)}")
-                except Exception as e:
-                    logging.debug(f"Failed to use filter dropdown approach: {str(e)}")
-            
-            # Save a screenshot to debug
-            self.driver.save_screenshot("after_search_before_posts_tab.png")
-            logging.info("Saved screenshot before Posts tab click attempt")
-            
-            if not posts_tab_clicked:
-                logging.warning("Could not click on Posts tab using any method. Taking a screenshot and saving page source for debugging.")
-                self.save_page_source("failed_posts_tab_click.html")
-            
-            # Verify we're on the Posts results page and take a screenshot
-            try:
-                # Wait for posts to load
-                WebDriverWait(self.driver, 10).until(
-                    EC.presence_of_element_located((By.CSS_SELECTOR, ".search-results__list, .reusable-search__result-container"))
-                )
-                logging.info("Posts results loaded successfully")
+                    # Commit the responses recorded during this pass
+                    self.save_response_history()
+                self.metrics.maybe_write()
                 
-                # Save a screenshot after attempting to click on Posts tab
-                screenshot_path = "after_posts_tab_click.png"
-                self.driver.save_screenshot(screenshot_path)
-                logging.info(f"Saved screenshot after Posts tab click to {screenshot_path}")
-            except:
-                logging.warning("Could not verify posts results loaded, continuing anyway")
+                if stale_posts >= stale_post_limit:
+                    stop_reason = 'age_window'
+                    break
+                if empty_scrolls >= empty_scroll_limit:
+                    stop_reason = 'no_new_posts'
+                    break
             
-            # Try to sort by recent posts
-            try:
-                # Click on sort dropdown
-                sort_dropdown_selectors = [
-                    "button.search-reusables__filter-trigger-and-dropdown",
-                    "button[aria-label='Sort by']",
-                    "button.artdeco-dropdown__trigger--is-dropdown-trigger",
-                    "button.search-reusables__sort-dropdown-trigger",
-                    "button.search-reusables__sort-filter",
-                    ".search-reusables__primary-filter button[data-control-name='sort_dropdown']"
-                ]
-                
-                sort_dropdown_found = False
-                for selector in sort_dropdown_selectors:
-                    try:
-                        sort_buttons = self.driver.find_elements(By.CSS_SELECTOR, selector)
-                        for sort_button in sort_buttons:
-                            if sort_button.is_displayed() and ("sort" in sort_button.text.lower() or "sort" in sort_button.get_attribute("aria-label").lower() if sort_button.get_attribute("aria-label") else False):
-                                self.driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", sort_button)
-                                time.sleep(1)
-                                self.driver.execute_script("arguments[0].click();", sort_button)
-                                sort_dropdown_found = True
-                                logging.info(f"Clicked sort dropdown with selector: {selector}")
-                                time.sleep(2)
-                                break
-                        if sort_dropdown_found:
-                            break
-                    except Exception as e:
-                        logging.debug(f"Failed to click sort dropdown with selector {selector}: {str(e)}")
-                
-                if not sort_dropdown_found:
-                    # Try XPath approach
-                    sort_xpath_selectors = [
-                        "//button[contains(text(), 'Sort by')]",
-                        "//button[contains(@aria-label, 'Sort')]",
-                        "//span[contains(text(), 'Sort')]/parent::button",
-                        "//div[contains(@class, 'search-reusables')]//*[contains(text(), 'Sort')]"
-                    ]
-                    
-                    for xpath in sort_xpath_selectors:
-                        try:
-                            sort_elements = self.driver.find_elements(By.XPATH, xpath)
-                            for sort_element in sort_elements:
-                                if sort_element.is_displayed():
-                                    self.driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", sort_element)
-                                    time.sleep(1)
-                                    self.driver.execute_script("arguments[0].click();", sort_element)
-                                    sort_dropdown_found = True
-                                    logging.info(f"Clicked sort dropdown with XPath: {xpath}")
-                                    time.sleep(2)
-                                    break
-                            if sort_dropdown_found:
-                                break
-                        except Exception as e:
-                            logging.debug(f"Failed to click sort dropdown with XPath {xpath}: {str(e)}")
+                # Scroll to load more
+                self.driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
+                logging.info(f"Scrolled to load more posts (scroll {scroll_count + 1}/{max_scrolls})")
+                with self.metrics.timer('scroll_wait'):
+                    loaded = self.waits.post_count_above('scroll', self.last_page_total, self.settings.get('scroll_wait_timeout', 5))
+                empty_scrolls = 0 if loaded else empty_scrolls + 1
+                scroll_count += 1
                 
-                # Click on "Recent" option
-                if sort_dropdown_found:
-                    recent_option_selectors = [
-                        "button[aria-label='Recent']",
-                        "button[aria-label='Sort by Recent']",
-                        "button.search-reusables__sort-filter-subfilter[data-control-name='recent_sort']",
-                        ".artdeco-dropdown__content button:nth-child(2)",
-                        ".search-reusables__sort-filter-dropdown button:nth-child(2)",
-                        "li.search-reusables__primary-filter button"
-                    ]
-                    
-                    recent_option_found = False
-                    for selector in recent_option_selectors:
-                        try:
-                            recent_options = self.driver.find_elements(By.CSS_SELECTOR, selector)
-                            for option in recent_options:
-                                if option.is_displayed() and "recent" in option.text.lower():
-                                    self.driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", option)
-                                    time.sleep(1)
-                                    self.driver.execute_script("arguments[0].click();", option)
-                                    recent_option_found = True
-                                    logging.info(f"Selected 'Recent' sort option with selector: {selector}")
-                                    time.sleep(3)
-                                    break
-                            if recent_option_found:
-                                break
-                        except Exception as e:
-                            logging.debug(f"Failed to click 'Recent' option with selector {selector}: {str(e)}")
-                    
-                    if not recent_option_found:
-                        # Try XPath approach for Recent option
-                        recent_xpath_selectors = [
-                            "//button[contains(text(), 'Recent')]",
-                            "//button[contains(@aria-label, 'Recent')]",
-                            "//span[contains(text(), 'Recent')]/parent::button",
-                            "//div[contains(@class, 'dropdown__content')]//*[contains(text(), 'Recent')]"
-                        ]
-                        
-                        for xpath in recent_xpath_selectors:
-                            try:
-                                recent_elements = self.driver.find_elements(By.XPATH, xpath)
-                                for element in recent_elements:
-                                    if element.is_displayed():
-                                        self.driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", element)
-                                        time.sleep(1)
-                                        self.driver.execute_script("arguments[0].click();", element)
-                                        recent_option_found = True
-                                        logging.info(f"Selected 'Recent' sort option with XPath: {xpath}")
-                                        time.sleep(3)
-                                        break
-                                if recent_option_found:
-                                    break
-                            except Exception as e:
-                                logging.debug(f"Failed to click 'Recent' option with XPath {xpath}: {str(e)}")
-                
-                # Now try to filter for Past 24 hours
-                try:
-                    # Click on date posted filter
-                    date_filter_selectors = [
-                        "button[aria-label='Date posted filter']",
-                        "button.search-reusables__filter-trigger-and-dropdown[aria-label='Date posted filter']",
-                        ".search-reusables__filter-trigger-and-dropdown button[aria-controls*='date']",
-                        ".artdeco-dropdown__trigger[aria-label*='Date']",
-                        "button[data-control-name='filter_timePosted']"
-                    ]
-                    
-                    date_filter_found = False
-                    for selector in date_filter_selectors:
-                        try:
-                            date_filters = self.driver.find_elements(By.CSS_SELECTOR, selector)
-                            for date_filter in date_filters:
-                                if date_filter.is_displayed() and ("date" in date_filter.text.lower() or "date" in date_filter.get_attribute("aria-label").lower() if date_filter.get_attribute("aria-label") else False):
-                                    self.driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", date_filter)
-                                    time.sleep(1)
-                                    self.driver.execute_script("arguments[0].click();", date_filter)
-                                    date_filter_found = True
-                                    logging.info(f"Clicked date filter dropdown with selector: {selector}")
-                                    time.sleep(2)
-                                    break
-                            if date_filter_found:
-                                break
-                        except Exception as e:
-                            logging.debug(f"Failed to click date filter with selector {selector}: {str(e)}")
-                    
-                    if not date_filter_found:
-                        # Try XPath approach for date filter
-                        date_xpath_selectors = [
-                            "//button[contains(text(), 'Date posted')]",
-                            "//button[contains(@aria-label, 'Date')]",
-                            "//span[contains(text(), 'Date')]/parent::button",
-                            "//div[contains(@class, 'search-reusables')]//*[contains(text(), 'Date')]"
-                        ]
-                        
-                        for xpath in date_xpath_selectors:
-                            try:
-                                date_elements = self.driver.find_elements(By.XPATH, xpath)
-                                for element in date_elements:
-                                    if element.is_displayed():
-                                        self.driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", element)
-                                        time.sleep(1)
-                                        self.driver.execute_script("arguments[0].click();", element)
-                                        date_filter_found = True
-                                        logging.info(f"Clicked date filter dropdown with XPath: {xpath}")
-                                        time.sleep(2)
-                                        break
-                                if date_filter_found:
-                                    break
-                            except Exception as e:
-                                logging.debug(f"Failed to click date filter with XPath {xpath}: {str(e)}")
-                    
-                    # Click on "Past 24 hours" option
-                    if date_filter_found:
-                        past24_selectors = [
-                            "button[aria-label='Past 24 hours']",
-                            "button.search-reusables__filter-value-item[data-control-name='timePosted_past-24']",
-                            ".artdeco-dropdown__content li:first-child button",
-                            ".search-reusables__dropdown-list li:first-child button",
-                            "button[data-control-name='filter_timePosted_24h']"
-                        ]
-                        
-                        past24_found = False
-                        for selector in past24_selectors:
-                            try:
-                                past24_options = self.driver.find_elements(By.CSS_SELECTOR, selector)
-                                for option in past24_options:
-                                    if option.is_displayed() and ("24" in option.text.lower() or "day" in option.text.lower()):
-                                        self.driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", option)
-                                        time.sleep(1)
-                                        self.driver.execute_script("arguments[0].click();", option)
-                                        past24_found = True
-                                        logging.info(f"Selected 'Past 24 hours' option with selector: {selector}")
-                                        time.sleep(3)
-                                        break
-                                if past24_found:
-                                    break
-                            except Exception as e:
-                                logging.debug(f"Failed to click 'Past 24 hours' option with selector {selector}: {str(e)}")
-                        
-                        if not past24_found:
-                            # Try XPath approach for Past 24 hours option
-                            past24_xpath_selectors = [
-                                "//button[contains(text(), 'Past 24')]",
-                                "//button[contains(text(), '24 hours')]",
-                                "//button[contains(@aria-label, 'Past 24')]",
-                                "//span[contains(text(), 'Past 24')]/parent::button",
-                                "//div[contains(@class, 'dropdown__content')]//*[contains(text(), 'Past 24')]"
-                            ]
-                            
-                            for xpath in past24_xpath_selectors:
-                                try:
-                                    past24_elements = self.driver.find_elements(By.XPATH, xpath)
-                                    for element in past24_elements:
-                                        if element.is_displayed():
-                                            self.driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", element)
-                                            time.sleep(1)
-                                            self.driver.execute_script("arguments[0].click();", element)
-                                            past24_found = True
-                                            logging.info(f"Selected 'Past 24 hours' option with XPath: {xpath}")
-                                            time.sleep(3)
-                                            break
-                                    if past24_found:
-                                        break
-                                except Exception as e:
-                                    logging.debug(f"Failed to click 'Past 24 hours' option with XPath {xpath}: {str(e)}")
-                except Exception as e:
-                    logging.warning(f"Failed to filter for Past 24 hours: {str(e)}")
             except Exception as e:
-                logging.warning(f"Failed to sort by recent posts: {str(e)}")
-            
-            posts_processed = 0
-            max_scrolls = 100
-            scroll_count = 0
-            
-            processed_post_ids = set()
-            
-            print("\nStarting continuous search mode - press Ctrl+C to stop")
-            
-            while scroll_count < max_scrolls:
-                # Get all visible posts
-                try:
-                    # Try different post selectors
-                    post_selectors = [
-                        ".feed-shared-update-v2",
-                        ".search-result__occluded-item",
-                        ".search-results__list-item",
-                        ".ember-view.occludable-update",
-                        ".search-content__result",
-                        "li.reusable-search__result-container",
-                        "div.feed-shared-update-v2__content",
-                        "div[data-urn]",
-                        "div.relative.ember-view"
-                    ]
-                    
-                    posts = []
-                    for selector in post_selectors:
-                        found_posts = self.driver.find_elements(By.CSS_SELECTOR, selector)
-                        if found_posts:
-                            posts = found_posts
-                            logging.info(f"Found {len(posts)} posts with selector: {selector}")
-                            break
-                    
-                    if not posts:
-                        logging.warning("No posts found. Trying to scroll...")
-                    else:
-                        logging.info(f"Processing {len(posts)} posts")
-                        
-                        # Process each post
-                        for post in posts:
-                            try:
-                                post_id = self.get_post_identifier(post)
-                                if post_id and post_id not in processed_post_ids:
-                                    processed_post_ids.add(post_id)
-                                    if self.process_post(post):
-                                        print("\nSuccessfully processed post!")
-                                        posts_processed += 1
-                                        self.save_response_history()
-                            except StaleElementReferenceException:
-                                logging.warning("Encountered stale element, skipping post")
-                                continue
-                
-                    # Scroll to load more
-                    self.driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-                    logging.info(f"Scrolled to load more posts (scroll {scroll_count + 1}/{max_scrolls})")
-                    time.sleep(3)
-                    scroll_count += 1
-                    
-                except Exception as e:
-                    logging.error(f"Error processing posts: {str(e)}")
-                    scroll_count += 1
-                    continue
+                logging.error(f"Error processing posts: {str(e)}")
+                scroll_count += 1
+                continue
 
-            if posts_processed == 0:
-                print("\nNo posts with emails were found. Try adjusting the search terms or scrolling more.")
+        oldest = f"{oldest_age / 3600:.1f}h" if oldest_age is not None else "unknown"
+        logging.info(f"Stopped scrolling after {scroll_count} scrolls ({stop_reason}, oldest post {oldest}, "
+                     f"{'sorted' if self.sorted_by_date else 'sort not confirmed'})")
+        self.metrics.increment('scroll_stops', reason=stop_reason)
+        
+        posts_sent = self.drain_fit_queue()
+        self.save_response_history()
 
-            print(f"\nCompleted search with {posts_processed} posts processed. Restarting search...")
-            time.sleep(10)  # Wait a bit before restarting
-            self.search_and_process_posts(search_term, max_posts)
+        if posts_processed == 0:
+            print("\nNo posts with emails were found. Try adjusting the search terms or scrolling more.")
 
-        except KeyboardInterrupt:
-            print("\nSearch stopped by user")
-            return
-        except Exception as e:
-            logging.error(f"Error in search and process: {str(e)}")
-            time.sleep(30)  # Wait longer on error
-            self.search_and_process_posts(search_term, max_posts)
+        print(f"\nCompleted search with {posts_processed} posts qualified, {posts_sent} answered.")
+        if self.email_cache:
+            print(self.email_cache.summary())
+        if self.waits:
+            logging.info(self.waits.summary())
+            self.waits.reset()
+        self.metrics.observe('cycle', time.perf_counter() - cycle_start)
+        self.metrics.write()
+        print(self.metrics.summary())
+        return {'posts_seen': posts_seen, 'posts_processed': posts_processed, 'posts_sent': posts_sent}
 
     def generate_email_content(self, post_details):
         """Generate email content using ChatGPT"""
         if not self.openai_client:
             raise Exception("OpenAI client not initialized")
 
-        # Load config to get user details
-        try:
-            with open('config.json', 'r') as f:
-                config = json.load(f)
-            user_email = config.get('gmail_email', '')
-            # Add phone number to config if it doesn't exist
-            user_phone = config.get('user_phone', 'Your Phone Number')
-            user_name = config.get('user_name', 'Your Full Name')
-        except Exception as e:
-            logging.warning(f"Could not load user details from config: {str(e)}")
-            user_email = self.email
-            user_phone = "Your Phone Number"
-            user_name = "Your Full Name"
-
-        # Load resume content if available
-        resume_content = ""
-        resume_paths = ['resume.txt', 'resume.md', 'resume.docx', 'resume.pdf']
-        
-        for path in resume_paths:
-            if os.path.exists(path):
-                try:
-                    if path.endswith('.txt') or path.endswith('.md'):
-                        with open(path, 'r', encoding='utf-8') as f:
-                            resume_content = f.read()
-                            logging.info(f"Loaded resume from {path}")
-                            break
-                    # For other formats, just note that we found it but can't read it directly
-                    else:
-                        resume_content = f"Resume found at {path} but content cannot be read directly."
-                        logging.info(f"Found resume at {path} but content cannot be read directly")
-                        break
-                except Exception as e:
-                    logging.warning(f"Could not read resume from {path}: {str(e)}")
+        # User details and resume come from settings, which only touch disk when the files change
+        user_email = self.settings.get('gmail_email', self.email)
+        user_phone = self.settings.get('user_phone', 'Your Phone Number')
+        user_name = self.settings.get('user_name', 'Your Full Name')
+        resume_content = self.settings.resume()
 
         # Determine if this is a contract/C2C position
         position_type = "Contract/C2C" if post_details.get('is_contract', False) else "Full-time"
 
-        prompt = f"""
-        Write a professional email response to a Java Developer {position_type} opportunity.
-        
-        Post Author: {post_details['author']}
-        Post Content: {post_details['content']}
-        Job Description: {post_details.get('job_description', 'Not provided')}
-        
-        My Resume Information:
-        {resume_content if resume_content else "Not provided, please use general Java developer experience"}
-        
-        Requirements:
-        1. Personalize based on the post content and job description
-        2. Keep it concise but professional
-        3. Express genuine interest in the opportunity
-        4. Highlight relevant Java development experience that matches the requirements mentioned in the job description
-        5. Emphasize that I am available for {position_type} roles
-        6. End with a call to action
-        7. Reference specific skills and requirements mentioned
-        8. Include company name and location if mentioned
-        9. Include my contact information at the end: Phone: {user_phone}, Email: {user_email}
-        10. Sign the email with my name: {user_name}
-        
-        Format:
-        Subject: [Your subject line]
-        
-        [Your email body]
-        
-        [Include my contact information and name at the end]
-        """
+        # Only the resume sections and post sentences that matter go into the prompt
+        self.prompt_builder.token_budget = self.settings.get('prompt_token_budget', 1000)
+        with self.metrics.timer('prompt_build'):
+            prompt, prompt_stats = self.prompt_builder.build(
+                post_details, resume_content, position_type, user_name, user_phone, user_email
+            )
+        logging.info(f"Prompt for {post_details['emails'][0]}: ~{prompt_stats['tokens']} tokens "
+                     f"(resume sections {prompt_stats['resume_sections']}, post sentences {prompt_stats['post_sentences']})")
 
         try:
-            response = self.openai_client.ChatCompletion.create(
-                model="gpt-3.5-turbo",
-                messages=[
-                    {"role": "system", "content": "You are a professional job seeker writing an email response to a LinkedIn post for a contract/C2C position."},
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=0.7,
-                max_tokens=500
-            )
+            with self.metrics.timer('openai'):
+                response = self.openai_client.ChatCompletion.create(
+                    model="gpt-3.5-turbo",
+                    messages=[
+                        {"role": "system", "content": "You are a professional job seeker writing an email response to a LinkedIn post for a contract/C2C position."},
+                        {"role": "user", "content": prompt}
+                    ],
+                    temperature=0.7,
+                    max_tokens=500
+                )
 
             email_content = response.choices[0].message['content'].strip()
+            self.metrics.increment('emails', event='generated')
             
             return email_content
 
         except Exception as e:
             logging.error(f"Error generating email content: {str(e)}")
+            self.metrics.increment('emails', event='generation_failed')
             return None
 
-    def draft_and_send_email(self, post_data, sender_email, sender_password):
-        """Draft and send an email response"""
-        try:
+    def draft_email(self, post_data):
+        """Generate an email for a post and return its (subject, body), or None on failure"""
+        # Reposts of the same job reuse the email already generated for it
+        cache_key = None
+        cached = None
+        if self.email_cache:
+            cache_key = EmailCache.key_for(post_data, self.settings.version())
+            cached = self.email_cache.get(cache_key)
+        
+        if cached:
+            subject, body = cached
+            logging.info(f"Reusing cached email for {post_data['emails'][0]}")
+            self.metrics.increment('emails', event='cache_hit')
+        else:
             # Generate email content
+            start = time.perf_counter()
             email_content = self.generate_email_content(post_data)
+            generation_seconds = time.perf_counter() - start
             if not email_content:
-                return False
+                return None
             
             # Parse the email content
             lines = email_content.strip().split('\n')
@@ -1124,78 +2683,401 @@ class LinkedInPostAutomation:
             
             body = '\n'.join(lines[start_idx:]).strip()
             
-            # Show the draft
-            print("\nGenerated Email:")
-            print(f"To: {post_data['emails'][0]}")
-            print(f"Subject: {subject}")
-            print(f"\nBody:\n{body}")
-            
+            if cache_key:
+                self.email_cache.put(cache_key, subject, body, generation_seconds)
+        
+        # Show the draft
+        print("\nGenerated Email:" if not cached else "\nGenerated Email (cached):")
+        print(f"To: {post_data['emails'][0]}")
+        print(f"Subject: {subject}")
+        print(f"\nBody:\n{body}")
+        return subject, body
+
+    def send_email(self, recipient, subject, body, sender_email, sender_password):
+        """Send an email over the shared SMTP session"""
+        try:
             # Auto-send email without confirmation
             print("\nAutomatically sending email...")
             
-            # Connect to Gmail SMTP server
-            server = smtplib.SMTP('smtp.gmail.com', 587)
-            server.starttls()
-            server.login(sender_email, sender_password)
+            # Reuse the authenticated SMTP session across sends
+            if not self.smtp:
+                self.smtp = SMTPTransport(
+                    host=self.settings.get('smtp_host', 'smtp.gmail.com'),
+                    port=self.settings.get('smtp_port', 587),
+                    username=sender_email,
+                    password=sender_password,
+                    use_tls=self.settings.get('smtp_starttls', True)
+                )
             
             # Create email message
             msg = MIMEMultipart()
             msg['From'] = sender_email
-            msg['To'] = post_data['emails'][0]
+            msg['To'] = recipient
             msg['Subject'] = subject
             msg.attach(MIMEText(body, 'plain'))
 
             # Send email
-            server.send_message(msg)
-            server.quit()
+            with self.metrics.timer('smtp_send'):
+                self.smtp.send(msg)
 
-            logging.info(f"Email sent successfully to {post_data['emails'][0]}")
-            print(f"\nEmail sent successfully to {post_data['emails'][0]}")
+            logging.info(f"Email sent successfully to {recipient}")
+            print(f"\nEmail sent successfully to {recipient}")
+            self.metrics.increment('emails', event='sent')
             return True
 
         except Exception as e:
             logging.error(f"Error sending email: {str(e)}")
             print(f"\nError sending email: {str(e)}")
+            self.metrics.increment('emails', event='send_failed')
+            return False
+
+    def draft_and_send_email(self, post_data, sender_email, sender_password):
+        """Draft and send an email response"""
+        try:
+            with self.metrics.timer('draft'):
+                draft = self.draft_email(post_data)
+        except Exception as e:
+            logging.error(f"Error drafting email: {str(e)}")
+            return False
+        if not draft:
             return False
+        subject, body = draft
+        return self.send_email(post_data['emails'][0], subject, body, sender_email, sender_password)
+
+    def drain_fit_queue(self):
+        """Answer queued posts best fit first until the cycle or daily budget is used up; the rest wait for later cycles"""
+        today = datetime.now().strftime('%Y-%m-%d')
+        self.fit_queue.start_day(today, self.state.count_emails_on(today))
+        max_age = self.settings.get('post_age_window_hours', 24) * 3600
+        # Budgets are read on every drain so config edits apply without a restart
+        allowance = self.fit_queue.allowance(self.settings.get('fit_cycle_budget', 0),
+                                             self.settings.get('fit_daily_budget', 0))
+        dispatched = 0
+        
+        while self.fit_queue and dispatched < allowance:
+            score, job = self.fit_queue.pop()
+            # Higher-ranked posts handled earlier in this drain may have taken the domain or the requirement
+            if time.time() - job['queued_at'] > max_age:
+                reason = 'expired'
+            elif self.state.has_emailed_domain(job['email_domain'], today):
+                reason = 'domain_emailed_today'
+            elif self.near_duplicates.find(job['signature'], self.pipeline and self.pipeline.pending_signatures()):
+                reason = 'near_duplicate'
+            else:
+                job['date'] = today
+                reason = None if self.dispatch_post(job) else 'dispatch_failed'
+            if reason:
+                logging.info(f"Dropped queued post {job['post_id']}: {reason}")
+                self.metrics.increment('posts_filtered', reason=reason)
+                continue
+            dispatched += 1
+            self.fit_queue.used_today += 1
+        
+        if self.fit_queue:
+            logging.info(f"{len(self.fit_queue)} qualified posts wait for a later cycle (budget {allowance})")
+        return dispatched
+
+    def dispatch_post(self, job):
+        """Hand a ranked post to the outbound workers, or draft and send it inline without a pipeline"""
+        fit = 'n/a' if job['score'] is None else f"{job['score']:.2f}"
+        logging.info(f"Responding to post {job['post_id']} (fit {fit})")
+        # The pipeline keeps the browser loop from waiting on OpenAI or SMTP
+        if self.pipeline:
+            return self.pipeline.submit(job)
+        
+        result = self.draft_and_send_email(job['post_data'], self.email, self.password)
+        if result:
+            # Record the response; the store batches commits
+            self.state.record_response(job['post_id'], job['post_data']['emails'][0], job['date'])
+            self.near_duplicates.add(job['signature'], job['post_id'])
+            return True
+        return False
+
+    def start_pipeline(self):
+        """Start the background workers that generate and send emails"""
+        self.pipeline = OutboundPipeline(
+            self,
+            generation_workers=self.settings.get('generation_workers', 2),
+            queue_size=self.settings.get('outbound_queue_size', 10)
+        )
+        self.pipeline.start()
 
     def close(self):
-        """Close the browser"""
+        """Drain queued emails, close the browser and SMTP session and flush the state store"""
+        if self.pipeline:
+            self.pipeline.close()
+        self.metrics.write()
+        if self.artifacts:
+            self.artifacts.close()
         if self.driver:
+            if self.logged_in:
+                self.save_cookies()
             self.driver.quit()
+        if self.smtp:
+            self.smtp.close()
+        if self.state:
+            self.state.close()
+
+# Tags whose text is never rendered, and block tags that break lines in innerText
+SNAPSHOT_SKIPPED_TAGS = {'script', 'style', 'svg', 'template', 'head', 'noscript'}
+SNAPSHOT_BLOCK_TAGS = {'p', 'div', 'li', 'ul', 'ol', 'br', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'section', 'article', 'tr'}
+SNAPSHOT_VOID_TAGS = {'area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input', 'link', 'meta', 'source', 'track', 'wbr'}
+
+SELECTOR_COMPOUND_PATTERN = re.compile(r'^([a-zA-Z][\w-]*)?((?:\.[\w-]+|\[[^\]]+\])*)$')
+SELECTOR_PART_PATTERN = re.compile(r'\.([\w-]+)|\[([\w-]+)(?:=[\'"]?([^\'"\]]*)[\'"]?)?\]')
+
+
+class SnapshotNode:
+    """Element node built from a saved HTML snapshot"""
+    __slots__ = ('tag', 'attrs', 'classes', 'children', 'parent')
+
+    def __init__(self, tag, attrs, parent=None):
+        self.tag = tag
+        self.attrs = attrs
+        self.classes = set(attrs.get('class', '').split())
+        self.children = []
+        self.parent = parent
+
+    def get(self, name):
+        return self.attrs.get(name)
+
+    def iter_descendants(self):
+        """Yield descendant elements in document order"""
+        stack = [child for child in reversed(self.children) if isinstance(child, SnapshotNode)]
+        while stack:
+            node = stack.pop()
+            yield node
+            stack.extend(child for child in reversed(node.children) if isinstance(child, SnapshotNode))
+
+    def select(self, selector):
+        """Return descendants matching a comma separated CSS selector, in document order"""
+        chains = parse_selector(selector)
+        return [node for node in self.iter_descendants() if any(node.matches(chain) for chain in chains)]
+
+    def matches(self, chain):
+        """Match a chain of compound selectors joined by descendant combinators"""
+        if not self.matches_compound(chain[-1]):
+            return False
+        node = self.parent
+        for compound in reversed(chain[:-1]):
+            while node is not None and not node.matches_compound(compound):
+                node = node.parent
+            if node is None:
+                return False
+            node = node.parent
+        return True
+
+    def matches_compound(self, compound):
+        tag, classes, attrs = compound
+        if tag and self.tag != tag:
+            return False
+        if not classes <= self.classes:
+            return False
+        for name, value in attrs:
+            if name not in self.attrs or (value is not None and self.attrs[name] != value):
+                return False
+        return True
+
+    def text(self):
+        """Approximate the element's innerText"""
+        parts = []
+        stack = [self]
+        while stack:
+            item = stack.pop()
+            if isinstance(item, str):
+                parts.append(item)
+                continue
+            if item.tag in SNAPSHOT_SKIPPED_TAGS or 'visually-hidden' in item.classes:
+                continue
+            if item.tag in SNAPSHOT_BLOCK_TAGS:
+                parts.append('\n')
+                stack.append('\n')
+            stack.extend(reversed(item.children))
+        lines = (' '.join(line.split()) for line in ''.join(parts).split('\n'))
+        return '\n'.join(line for line in lines if line)
+
+
+def parse_selector(selector):
+    """Parse a selector group into chains of (tag, classes, attributes) compounds"""
+    chains = _SELECTOR_CACHE.get(selector)
+    if chains is None:
+        chains = []
+        for group in selector.split(','):
+            chain = []
+            for compound in group.split():
+                match = SELECTOR_COMPOUND_PATTERN.match(compound)
+                if not match:
+                    raise ValueError(f"Unsupported selector: {compound}")
+                classes = set()
+                attrs = []
+                for class_name, attr_name, attr_value in SELECTOR_PART_PATTERN.findall(match.group(2)):
+                    if class_name:
+                        classes.add(class_name)
+                    else:
+                        attrs.append((attr_name, attr_value if '=' in compound else None))
+                chain.append((match.group(1), classes, attrs))
+            chains.append(chain)
+        _SELECTOR_CACHE[selector] = chains
+    return chains
+
+_SELECTOR_CACHE = {}
+
+
+class SnapshotParser(HTMLParser):
+    """Build a SnapshotNode tree from page source saved by save_page_source"""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.root = SnapshotNode('#document', {})
+        self.current = self.root
+
+    def handle_starttag(self, tag, attrs):
+        node = SnapshotNode(tag, {name: value or '' for name, value in attrs}, self.current)
+        self.current.children.append(node)
+        if tag not in SNAPSHOT_VOID_TAGS:
+            self.current = node
+
+    def handle_startendtag(self, tag, attrs):
+        self.current.children.append(SnapshotNode(tag, {name: value or '' for name, value in attrs}, self.current))
+
+    def handle_endtag(self, tag):
+        # Close up to the matching open tag, ignoring stray end tags
+        node = self.current
+        while node is not None and node.tag != tag:
+            node = node.parent
+        if node is not None and node.parent is not None:
+            self.current = node.parent
+
+    def handle_data(self, data):
+        self.current.children.append(data)
+
+
+def load_snapshot_records(path):
+    """Parse a saved page (plain or gzip-compressed) into the same post records extract_post_records returns"""
+    opener = gzip.open if path.endswith('.gz') else open
+    with opener(path, 'rt', encoding='utf-8', errors='replace') as f:
+        parser = SnapshotParser()
+        parser.feed(f.read())
+        parser.close()
+    root = parser.root
+    
+    posts = []
+    for selector in POST_SELECTORS:
+        posts = root.select(selector)
+        if posts:
+            break
+    
+    records = []
+    for post in posts:
+        texts = lambda field: [node.text() for node in post.select(POST_FIELD_SELECTORS[field])]
+        content = ''.join(text + ' ' for text in texts('content')).strip()
+        job_description = ''.join(text + ' ' for text in texts('job_description') if text and text not in content).strip()
+        permalink = next((link.get('href') for link in post.select(POST_FIELD_SELECTORS['links'])
+                          if link.get('href') and '/posts/' in link.get('href')), '')
+        records.append({
+            'data_id': post.get('data-id') or '',
+            'urn': post.get('data-urn') or '',
+            'author': ''.join(text + ' ' for text in texts('author')).strip(),
+            'age': ''.join(text + ' ' for text in texts('age')).strip(),
+            'age_seconds': parse_post_age(''.join(texts('age'))),
+            'content': content,
+            'job_description': job_description,
+            'permalink': permalink,
+            'id_author': ''.join(text + ' ' for text in texts('id_author')),
+            'id_content': ''.join(text + ' ' for text in texts('id_content'))
+        })
+    return records
+
+
+def replay_snapshots(directory):
+    """Run saved page snapshots through the post filters and print one JSON decision per post"""
+    # A throwaway in-memory store keeps replay from touching the live response history
+    bot = LinkedInPostAutomation(state_file=':memory:')
+    paths = sorted(glob.glob(os.path.join(directory, '*.html')) + glob.glob(os.path.join(directory, '*.html.gz')))
+    start = time.perf_counter()
+    total = 0
+    qualified = 0
+    reasons = {}
+    
+    for path in paths:
+        try:
+            records = load_snapshot_records(path)
+        except Exception as e:
+            logging.error(f"Could not parse snapshot {path}: {str(e)}")
+            continue
+        
+        for record in records:
+            decision = bot.evaluate_post(record)
+            total += 1
+            if decision['qualified']:
+                qualified += 1
+            else:
+                reasons[decision['reason']] = reasons.get(decision['reason'], 0) + 1
+            print(json.dumps({
+                'file': os.path.basename(path),
+                'post_id': decision['post_id'],
+                'urn': record['urn'],
+                'author': decision['author'],
+                'age_seconds': record['age_seconds'],
+                'qualified': decision['qualified'],
+                'reason': decision['reason'],
+                'emails': decision['emails'],
+                'is_us_job': decision['is_us_job'],
+                'is_contract': decision['is_contract'],
+                'matches': decision['matches']
+            }))
+    
+    elapsed = time.perf_counter() - start
+    logging.info(f"Replayed {total} posts from {len(paths)} snapshots in {elapsed:.2f}s: "
+                 f"{qualified} qualified, skipped {reasons}")
+
+
+# Credentials that must be filled in before the bot can run
+REQUIRED_CONFIG_KEYS = ['linkedin_email', 'linkedin_password', 'gmail_email', 'gmail_app_password', 'openai_api_key']
 
 def load_config():
-    """Load credentials from config file"""
+    """Load settings from the config file"""
     config_file = 'config.json'
     if not os.path.exists(config_file):
-        default_config = {
-            "linkedin_email": "",
-            "linkedin_password": "",
-            "gmail_email": "",
-            "gmail_app_password": "",
-            "openai_api_key": ""
-        }
+        default_config = {key: "" for key in REQUIRED_CONFIG_KEYS}
         with open(config_file, 'w') as f:
             json.dump(default_config, f, indent=4)
         print(f"Please fill in your credentials in {config_file}")
         return None
     
-    with open(config_file, 'r') as f:
-        config = json.load(f)
+    settings = Settings(config_file)
     
-    if any(not value for value in config.values()):
+    if any(not settings.config.get(key) for key in REQUIRED_CONFIG_KEYS):
         print(f"Please fill in all credentials in {config_file}")
         return None
     
-    return config
+    return settings
 
 def main():
+    parser = argparse.ArgumentParser(description="LinkedIn job post automation")
+    parser.add_argument('--replay', metavar='DIR',
+                        help="Run the post filters over saved HTML snapshots in DIR without a browser")
+    parser.add_argument('--measure-browser', metavar='URL', nargs='?', const="https://www.linkedin.com/",
+                        help="Compare page load time and memory of the standard and lean browser on URL")
+    args = parser.parse_args()
+    setup_logging()
+    
+    if args.replay:
+        replay_snapshots(args.replay)
+        return
+    if args.measure_browser:
+        measure_browser(args.measure_browser)
+        return
+    
     # Load configuration
-    config = load_config()
-    if not config:
+    settings = load_config()
+    if not settings:
         return
+    config = settings.config
+    setup_logging(settings)
     
     # Initialize the automation
-    bot = LinkedInPostAutomation()
+    bot = LinkedInPostAutomation(settings)
     
     try:
         # Store email credentials
@@ -1205,12 +3087,13 @@ def main():
         # Setup OpenAI
         bot.setup_openai(config['openai_api_key'])
         
-        # Setup and login
+        # Start the email workers, then setup and login
+        bot.start_pipeline()
         bot.setup_driver()
-        bot.login_to_linkedin(config['linkedin_email'], config['linkedin_password'])
+        bot.start_session(config['linkedin_email'], config['linkedin_password'])
         
-        # Search and process posts
-        bot.search_and_process_posts("java developer")
+        # Search and process posts until interrupted
+        SearchScheduler(bot).run(SearchTermQueue.from_settings(settings))
         
     except Exception as e:
         logging.error(f"An error occurred: {str(e)}")